@@ -1,7 +1,7 @@
 """Database configuration, session management, and schema initialization."""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 import os
 
 from .migrations import run_migrations
@@ -18,14 +18,60 @@ SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    # FastAPI runs sync endpoints on a threadpool; the default pool of
+    # 5 (+10 overflow) exhausts under moderate concurrency.
+    pool_size=20,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    # Room for every statement shape the app emits, so compilation stays a
+    # cache lookup even with the eager-load variants
+    query_cache_size=1024,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers run concurrently with a writer instead of serializing
+    behind it, and synchronous=NORMAL drops the per-commit fsync of the main
+    database file (durable in WAL mode; at most the last transaction is lost
+    on power failure).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+# Sessions live for one request, so there is nothing to go stale after
+# commit; keeping attributes alive avoids a re-SELECT of rows we just wrote.
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 Base = declarative_base()
 
 
+# Monotonic counter advanced on every commit. Rendered-output caches use it
+# as a version key: any committed write invalidates them wholesale, which is
+# cheap and can never serve stale data.
+_data_version = 0
+
+
+def data_version() -> int:
+    """Current write-generation of the database (bumped on every commit)."""
+    return _data_version
+
+
+@event.listens_for(Session, "after_commit")
+def _advance_data_version(session):
+    global _data_version
+    _data_version += 1
+
+
 def get_db():
     """Dependency that provides a database session."""
     db = SessionLocal()
@@ -17,6 +17,7 @@ def enrich_barcode(
     barcode: Barcode,
     *,
     translate: Optional[bool] = None,
+    use_cache: bool = True,
 ) -> dict:
     """
     Fetch product data from Open Food Facts and store it on the barcode.
@@ -24,13 +25,25 @@ def enrich_barcode(
     Returns a status dict: {"ok": bool, "found": bool, "error": optional str}
     """
     try:
-        product = openfoodfacts_service.fetch_product(barcode.code)
+        product = openfoodfacts_service.fetch_product(barcode.code, use_cache=use_cache)
     except Exception as e:
         return {"ok": False, "found": False, "error": str(e)}
 
     if not product:
         return {"ok": True, "found": False, "error": None}
 
+    apply_fetched_product(db, barcode, product, translate=translate)
+    return {"ok": True, "found": True, "error": None}
+
+
+def apply_fetched_product(
+    db: Session,
+    barcode: Barcode,
+    product: dict,
+    *,
+    translate: Optional[bool] = None,
+) -> None:
+    """Translate (optionally) and store an already-fetched product payload."""
     should_translate = (
         translate
         if translate is not None
@@ -49,4 +62,3 @@ def enrich_barcode(
 
     apply_product_data(barcode, product)
     db.add(barcode)
-    return {"ok": True, "found": True, "error": None}
@@ -213,9 +213,13 @@ Suggest 5-10 practical grocery items. Prioritize ingredients needed for favorite
         }
 
 
+# The key is read once at import; no need to re-derive this per call
+_CONFIGURED = GEMINI_API_KEY is not None and len(GEMINI_API_KEY) > 0
+
+
 def is_configured() -> bool:
     """Check if Gemini API is configured."""
-    return GEMINI_API_KEY is not None and len(GEMINI_API_KEY) > 0
+    return _CONFIGURED
 
 
 def _extract_json_text(response_text: str) -> str:
@@ -5,15 +5,28 @@ A minimal, local-first application to track home inventory and grocery lists
 using barcode scanning, with AI-powered recipe suggestions.
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, StreamingResponse
+from sqlalchemy import func, or_, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import Optional
+from collections import OrderedDict
+import asyncio
+import hashlib
 import json
 import os
+import re
+import time
 
-from .database import engine, get_db, Base, init_db
+import orjson
+import requests as http_requests
+
+from .database import engine, get_db, Base, init_db, data_version
 from .models import Item, Barcode, ItemLocation, Recipe, RecipeIngredient, RecipeStep
 from . import schemas
 from . import gemini_service
@@ -28,26 +41,47 @@ init_db(engine)
 app = FastAPI(
     title="Home Inventory Manager",
     description="Local-first inventory and grocery list management with barcode scanning",
-    version="2.1.0"
+    version="2.1.0",
+    # orjson encodes responses several times faster than stdlib json and
+    # emits bytes directly, which matters for the big list endpoints
+    default_response_class=ORJSONResponse,
 )
 
+# Compresses the recipe page, the index bundle and big list responses;
+# far larger byte savings than whitespace minification, with no build step
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # --- Static Files ---
 
 static_path = os.path.join(os.path.dirname(__file__), "static")
 if os.path.exists(static_path):
     app.mount("/static", StaticFiles(directory=static_path), name="static")
 
+# The bundle never changes while the process runs; resolve the path and stat
+# once instead of per request.
+INDEX_HTML_PATH = os.path.join(static_path, "index.html")
+_INDEX_HTML_STAT = os.stat(INDEX_HTML_PATH) if os.path.exists(INDEX_HTML_PATH) else None
+
+
+@app.middleware("http")
+async def static_cache_control(request: Request, call_next):
+    """Mark /static assets immutable; URLs carry a content-hash version."""
+    response = await call_next(request)
+    if request.url.path.startswith("/static/"):
+        response.headers.setdefault("Cache-Control", "public, max-age=31536000, immutable")
+    return response
+
 
 @app.get("/", include_in_schema=False)
 async def root():
     """Serve the main web interface."""
-    return FileResponse(os.path.join(static_path, "index.html"))
+    return FileResponse(INDEX_HTML_PATH, stat_result=_INDEX_HTML_STAT)
 
 
 @app.get("/kiosk", include_in_schema=False)
 async def kiosk():
     """Serve the kiosk (read/move-only) web interface."""
-    return FileResponse(os.path.join(static_path, "index.html"))
+    return FileResponse(INDEX_HTML_PATH, stat_result=_INDEX_HTML_STAT)
 
 
 # --- Health Check ---
@@ -58,6 +92,7 @@ async def health_check():
     return {
         "status": "healthy",
         "gemini_configured": gemini_service.is_configured(),
+        "db_pool_checked_out": engine.pool.checkedout(),
     }
 
 
@@ -92,14 +127,15 @@ async def lookup_barcode(code: str, db: Session = Depends(get_db)):
 
     Marks the barcode as last-scanned (active) and optionally enriches from Open Food Facts.
     """
-    barcode = db.query(Barcode).filter(Barcode.code == code).first()
+    barcode = db.query(Barcode).options(
+        joinedload(Barcode.item)
+    ).filter(Barcode.code == code).first()
 
     if barcode:
         product_data.mark_barcode_scanned(db, barcode)
         if product_data.setting_is_true(db, "auto_fetch_products") and barcode.product_fetched_at is None:
             enrichment.enrich_barcode(db, barcode)
         db.commit()
-        db.refresh(barcode.item)
         return schemas.BarcodeLookupResponse(
             found=True,
             barcode=code,
@@ -131,25 +167,28 @@ async def associate_barcode(
     db: Session = Depends(get_db)
 ):
     """Associate a barcode with an existing item."""
-    existing = db.query(Barcode).filter(Barcode.code == request.barcode).first()
+    existing = db.query(Barcode).options(joinedload(Barcode.item)).filter(
+        Barcode.code == request.barcode
+    ).first()
     if existing:
         raise HTTPException(
             status_code=400,
             detail=f"Barcode already associated with item: {existing.item.name}"
         )
 
-    item = db.query(Item).filter(Item.id == request.item_id).first()
+    item = db.get(Item, request.item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    barcode = Barcode(code=request.barcode, item_id=item.id)
+    # Attach via the relationship so the selectin-loaded item.barcodes
+    # collection includes the new code in the response
+    barcode = Barcode(code=request.barcode, item=item)
     db.add(barcode)
     db.flush()
     product_data.mark_barcode_scanned(db, barcode)
     if product_data.setting_is_true(db, "auto_fetch_products"):
         enrichment.enrich_barcode(db, barcode)
     db.commit()
-    db.refresh(item)
     return serialize_item(item)
 
 
@@ -158,11 +197,33 @@ async def reload_all_barcodes(db: Session = Depends(get_db)):
     """Fetch Open Food Facts data for every barcode (settings → reload)."""
     barcodes = db.query(Barcode).all()
     updated = not_found = errors = 0
-    for barcode in barcodes:
-        result = enrichment.enrich_barcode(db, barcode)
-        if not result["ok"]:
+
+    # Fan the network fetches out over the threadpool; a serial reload of N
+    # barcodes costs N round-trips back-to-back. The semaphore bounds how
+    # many per-thread sessions/sockets open at once, and DB writes stay on
+    # this session afterwards.
+    fetch_slots = asyncio.Semaphore(8)
+
+    async def _fetch(barcode):
+        async with fetch_slots:
+            try:
+                # An explicit reload must bypass the product cache
+                product = await run_in_threadpool(
+                    lambda code=barcode.code: openfoodfacts_service.fetch_product(
+                        code, use_cache=False
+                    )
+                )
+                return {"ok": True, "product": product, "error": None}
+            except Exception as e:
+                return {"ok": False, "product": None, "error": str(e)}
+
+    fetches = await asyncio.gather(*(_fetch(b) for b in barcodes))
+
+    for barcode, fetched in zip(barcodes, fetches):
+        if not fetched["ok"]:
             errors += 1
-        elif result["found"]:
+        elif fetched["product"]:
+            enrichment.apply_fetched_product(db, barcode, fetched["product"])
             updated += 1
         else:
             not_found += 1
@@ -178,14 +239,13 @@ async def reload_all_barcodes(db: Session = Depends(get_db)):
 @app.post("/api/barcodes/{barcode_id}/fetch", response_model=schemas.BarcodeResponse)
 async def fetch_barcode_product(barcode_id: int, db: Session = Depends(get_db)):
     """Fetch/refresh Open Food Facts data for a single barcode."""
-    barcode = db.query(Barcode).filter(Barcode.id == barcode_id).first()
+    barcode = db.get(Barcode, barcode_id)
     if not barcode:
         raise HTTPException(status_code=404, detail="Barcode not found")
-    result = enrichment.enrich_barcode(db, barcode)
+    result = enrichment.enrich_barcode(db, barcode, use_cache=False)
     if not result["ok"]:
         raise HTTPException(status_code=502, detail=result.get("error") or "Fetch failed")
     db.commit()
-    db.refresh(barcode)
     active_id = barcode.item.active_barcode_id if barcode.item else None
     return serialize_barcode(barcode, active_id)
 
@@ -197,46 +257,68 @@ async def update_barcode_product(
     db: Session = Depends(get_db),
 ):
     """Manually edit product / nutrition fields stored on a barcode."""
-    barcode = db.query(Barcode).filter(Barcode.id == barcode_id).first()
+    barcode = db.get(Barcode, barcode_id)
     if not barcode:
         raise HTTPException(status_code=404, detail="Barcode not found")
     product_data.apply_barcode_update(barcode, update.model_dump(exclude_unset=True))
     db.commit()
-    db.refresh(barcode)
     active_id = barcode.item.active_barcode_id if barcode.item else None
     return serialize_barcode(barcode, active_id)
 
 
 # --- Item Endpoints ---
 
+def get_item_or_404(item_id: int, db: Session = Depends(get_db)) -> Item:
+    """Resolve the {item_id} path parameter (barcodes load selectin with it)."""
+    item = db.get(Item, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+
 @app.get("/api/items", response_model=list[schemas.ItemResponse])
 async def list_items(
     location: Optional[ItemLocation] = None,
     db: Session = Depends(get_db)
 ):
     """List all items, optionally filtered by location."""
-    query = db.query(Item)
+    stmt = select(Item).order_by(Item.name)
     if location:
-        query = query.filter(Item.location == location)
-    return [serialize_item(item) for item in query.order_by(Item.name).all()]
+        stmt = stmt.where(Item.location == location)
+    items = [serialize_item(item) for item in db.scalars(stmt).all()]
+    return Response(
+        content=schemas.ITEM_LIST_ADAPTER.dump_json(items),
+        media_type="application/json",
+    )
 
 
 @app.post("/api/items", response_model=schemas.ItemResponse)
 async def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
     """Create a new item, optionally with an associated barcode."""
-    existing = db.query(Item).filter(Item.name == item.name).first()
-    if existing:
+    # One round-trip for both duplicate checks: matching rows carry the
+    # owning item's name, which the error messages need.
+    conflicts = [Item.name == item.name]
+    if item.barcode:
+        conflicts.append(Barcode.code == item.barcode)
+    rows = (
+        db.query(Item.name, Barcode.code)
+        .outerjoin(Barcode, Barcode.item_id == Item.id)
+        .filter(or_(*conflicts))
+        .all()
+    )
+
+    if any(name == item.name for name, _code in rows):
         raise HTTPException(
             status_code=400,
             detail=f"Item with name '{item.name}' already exists"
         )
 
     if item.barcode:
-        existing_barcode = db.query(Barcode).filter(Barcode.code == item.barcode).first()
-        if existing_barcode:
+        owner = next((name for name, code in rows if code == item.barcode), None)
+        if owner:
             raise HTTPException(
                 status_code=400,
-                detail=f"Barcode already associated with item: {existing_barcode.item.name}"
+                detail=f"Barcode already associated with item: {owner}"
             )
 
     db_item = Item(name=item.name, location=item.location)
@@ -252,16 +334,12 @@ async def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
             enrichment.enrich_barcode(db, barcode)
 
     db.commit()
-    db.refresh(db_item)
     return serialize_item(db_item)
 
 
 @app.get("/api/items/{item_id}", response_model=schemas.ItemResponse)
-async def get_item(item_id: int, db: Session = Depends(get_db)):
+async def get_item(item: Item = Depends(get_item_or_404)):
     """Get a specific item by ID."""
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
     return serialize_item(item)
 
 
@@ -272,16 +350,22 @@ async def update_item(
     db: Session = Depends(get_db)
 ):
     """Update an item's name, location, or active barcode."""
-    item = db.query(Item).filter(Item.id == item_id).first()
+    # Fetch the item and check for a name conflict in the same round-trip
+    if update.name is not None:
+        candidates = db.query(Item).filter(
+            or_(Item.id == item_id, Item.name == update.name)
+        ).all()
+        item = next((i for i in candidates if i.id == item_id), None)
+        duplicate = any(i.id != item_id and i.name == update.name for i in candidates)
+    else:
+        item = db.get(Item, item_id)
+        duplicate = False
+
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
     if update.name is not None:
-        existing = db.query(Item).filter(
-            Item.name == update.name,
-            Item.id != item_id
-        ).first()
-        if existing:
+        if duplicate:
             raise HTTPException(
                 status_code=400,
                 detail=f"Item with name '{update.name}' already exists"
@@ -292,119 +376,188 @@ async def update_item(
         item.location = update.location
 
     if update.active_barcode_id is not None:
-        barcode = db.query(Barcode).filter(
-            Barcode.id == update.active_barcode_id,
-            Barcode.item_id == item.id,
-        ).first()
-        if not barcode:
+        belongs = db.query(
+            db.query(Barcode.id).filter(
+                Barcode.id == update.active_barcode_id,
+                Barcode.item_id == item.id,
+            ).exists()
+        ).scalar()
+        if not belongs:
             raise HTTPException(status_code=400, detail="Barcode does not belong to this item")
-        item.active_barcode_id = barcode.id
+        item.active_barcode_id = update.active_barcode_id
 
     db.commit()
-    db.refresh(item)
     return serialize_item(item)
 
 
 @app.post("/api/items/{item_id}/active-barcode", response_model=schemas.ItemResponse)
 async def set_active_barcode(
-    item_id: int,
     request: schemas.SetActiveBarcodeRequest,
+    item: Item = Depends(get_item_or_404),
     db: Session = Depends(get_db),
 ):
     """Manually set which barcode is active for an item."""
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    barcode = db.query(Barcode).filter(
-        Barcode.id == request.barcode_id,
-        Barcode.item_id == item.id,
-    ).first()
-    if not barcode:
+    belongs = db.query(
+        db.query(Barcode.id).filter(
+            Barcode.id == request.barcode_id,
+            Barcode.item_id == item.id,
+        ).exists()
+    ).scalar()
+    if not belongs:
         raise HTTPException(status_code=400, detail="Barcode does not belong to this item")
-    item.active_barcode_id = barcode.id
+    item.active_barcode_id = request.barcode_id
     db.commit()
-    db.refresh(item)
     return serialize_item(item)
 
 
 @app.delete("/api/items/{item_id}")
-async def delete_item(item_id: int, db: Session = Depends(get_db)):
+async def delete_item(item: Item = Depends(get_item_or_404), db: Session = Depends(get_db)):
     """Delete an item and all associated barcodes."""
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
+    item_id = item.id
     db.delete(item)
     db.commit()
-    
+
     return {"deleted": True, "id": item_id}
 
 
 # --- Move Item Shortcuts ---
 
 @app.post("/api/items/{item_id}/to-inventory", response_model=schemas.ItemResponse)
-async def move_to_inventory(item_id: int, db: Session = Depends(get_db)):
+async def move_to_inventory(item: Item = Depends(get_item_or_404), db: Session = Depends(get_db)):
     """Move an item to inventory (it's now at home)."""
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-
     item.location = ItemLocation.INVENTORY
     db.commit()
-    db.refresh(item)
     return serialize_item(item)
 
 
 @app.post("/api/items/{item_id}/to-grocery", response_model=schemas.ItemResponse)
-async def move_to_grocery(item_id: int, db: Session = Depends(get_db)):
+async def move_to_grocery(item: Item = Depends(get_item_or_404), db: Session = Depends(get_db)):
     """Move an item to grocery list (needs restocking)."""
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-
     item.location = ItemLocation.GROCERY_LIST
     db.commit()
-    db.refresh(item)
     return serialize_item(item)
 
 
 @app.post("/api/items/{item_id}/remove", response_model=schemas.ItemResponse)
-async def remove_from_lists(item_id: int, db: Session = Depends(get_db)):
+async def remove_from_lists(item: Item = Depends(get_item_or_404), db: Session = Depends(get_db)):
     """Remove an item from both inventory and grocery list (set to neither)."""
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-
     item.location = ItemLocation.NEITHER
     db.commit()
-    db.refresh(item)
     return serialize_item(item)
 
 
 # --- Home Assistant Friendly Endpoints ---
 
+def _etag_json_response(request: Request, payload) -> Response:
+    """Serialize a response model once and answer conditional GETs with 304.
+
+    Home Assistant polls the inventory/grocery lists on a schedule; hashing
+    the encoded body catches every change that is visible in the payload
+    (including barcode product edits, which no per-table timestamp would).
+    """
+    body = orjson.dumps(payload.model_dump(mode="json"))
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @app.get("/api/inventory", response_model=schemas.InventoryListResponse)
-async def get_inventory(db: Session = Depends(get_db)):
+async def get_inventory(request: Request, count_only: bool = False, db: Session = Depends(get_db)):
     """Get all items currently in inventory."""
-    items = db.query(Item).filter(
-        Item.location == ItemLocation.INVENTORY
-    ).order_by(Item.name).all()
-    return schemas.InventoryListResponse(
+    if count_only:
+        # Home Assistant sensors often only need the number
+        count = db.query(func.count(Item.id)).filter(
+            Item.location == ItemLocation.INVENTORY
+        ).scalar()
+        return schemas.InventoryListResponse(count=count, items=[])
+
+    items = db.scalars(
+        select(Item).where(Item.location == ItemLocation.INVENTORY).order_by(Item.name)
+    ).all()
+    payload = schemas.InventoryListResponse(
         count=len(items),
         items=[serialize_item(i) for i in items],
     )
+    return _etag_json_response(request, payload)
 
 
 @app.get("/api/grocery", response_model=schemas.GroceryListResponse)
-async def get_grocery_list(db: Session = Depends(get_db)):
+async def get_grocery_list(request: Request, count_only: bool = False, db: Session = Depends(get_db)):
     """Get all items on the grocery list."""
-    items = db.query(Item).filter(
-        Item.location == ItemLocation.GROCERY_LIST
-    ).order_by(Item.name).all()
-    return schemas.GroceryListResponse(
+    if count_only:
+        count = db.query(func.count(Item.id)).filter(
+            Item.location == ItemLocation.GROCERY_LIST
+        ).scalar()
+        return schemas.GroceryListResponse(count=count, items=[])
+
+    items = db.scalars(
+        select(Item).where(Item.location == ItemLocation.GROCERY_LIST).order_by(Item.name)
+    ).all()
+    payload = schemas.GroceryListResponse(
         count=len(items),
         items=[serialize_item(i) for i in items],
     )
+    return _etag_json_response(request, payload)
+
+
+@app.post("/api/grocery/bulk-add", response_model=schemas.BulkGroceryAddResponse)
+async def bulk_add_to_grocery(
+    request: schemas.BulkGroceryAddRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Put a batch of ingredients on the grocery list in one transaction.
+
+    Each entry is resolved like the recipe page used to do client-side —
+    linked item moves, exact name match moves, otherwise a new item is
+    created — but with two lookup queries and one commit instead of up to
+    three HTTP round-trips per ingredient.
+    """
+    ids = [ing.item_id for ing in request.ingredients if ing.item_id]
+    # Collect every name: entries with a stale item_id (item deleted since
+    # the page rendered) must fall back to name resolution rather than
+    # colliding with an existing row on create.
+    names_lower = {
+        ing.name.lower()
+        for ing in request.ingredients
+        if ing.name
+    }
+
+    items_by_id = {}
+    if ids:
+        items_by_id = {
+            item.id: item
+            for item in db.query(Item).filter(Item.id.in_(ids)).all()
+        }
+    items_by_name = {}
+    if names_lower:
+        items_by_name = {
+            item.name.lower(): item
+            for item in db.query(Item).filter(func.lower(Item.name).in_(names_lower)).all()
+        }
+
+    affected = []
+    for ing in request.ingredients:
+        item = items_by_id.get(ing.item_id) if ing.item_id else None
+        if item is None and ing.name:
+            item = items_by_name.get(ing.name.lower())
+        if item is None:
+            if not ing.name:
+                continue
+            item = Item(name=ing.name, location=ItemLocation.GROCERY_LIST)
+            db.add(item)
+            db.flush()
+            items_by_name[ing.name.lower()] = item
+        else:
+            item.location = ItemLocation.GROCERY_LIST
+        affected.append(item)
+
+    db.commit()
+    return schemas.BulkGroceryAddResponse(
+        added=len(affected),
+        items=[serialize_item(i) for i in affected],
+    )
 
 
 # --- Search ---
@@ -412,10 +565,38 @@ async def get_grocery_list(db: Session = Depends(get_db)):
 @app.get("/api/search", response_model=list[schemas.ItemResponse])
 async def search_items(q: str, db: Session = Depends(get_db)):
     """Search items by name (case-insensitive partial match)."""
-    items = db.query(Item).filter(
-        Item.name.ilike(f"%{q}%")
-    ).order_by(Item.name).all()
-    return [serialize_item(i) for i in items]
+    # The trigram FTS index answers substring queries without a table scan,
+    # but needs at least 3 characters. Shorter queries — and databases whose
+    # SQLite lacks FTS5 — fall back to the LIKE scan.
+    if len(q) >= 3:
+        try:
+            match = '"' + q.replace('"', '""') + '"'
+            ids = [
+                row[0]
+                for row in db.execute(
+                    text("SELECT rowid FROM items_fts WHERE items_fts MATCH :match"),
+                    {"match": match},
+                )
+            ]
+            items = db.scalars(
+                select(Item).where(Item.id.in_(ids)).order_by(Item.name)
+            ).all()
+            return Response(
+                content=schemas.ITEM_LIST_ADAPTER.dump_json(
+                    [serialize_item(i) for i in items]
+                ),
+                media_type="application/json",
+            )
+        except OperationalError:
+            db.rollback()
+
+    items = db.scalars(
+        select(Item).where(Item.name.ilike(f"%{q}%")).order_by(Item.name)
+    ).all()
+    return Response(
+        content=schemas.ITEM_LIST_ADAPTER.dump_json([serialize_item(i) for i in items]),
+        media_type="application/json",
+    )
 
 
 # --- Recipe Endpoints ---
@@ -426,14 +607,26 @@ async def list_recipes(
     db: Session = Depends(get_db)
 ):
     """List all saved recipes."""
-    query = db.query(Recipe)
+    stmt = select(Recipe).order_by(Recipe.created_at.desc())
+    count_stmt = select(func.count()).select_from(Recipe)
     if favorites_only:
-        query = query.filter(Recipe.is_favorite.is_(True))
-    recipes = query.order_by(Recipe.created_at.desc()).all()
-    return schemas.RecipeListResponse(
-        count=len(recipes),
-        recipes=[serialize_recipe(r) for r in recipes],
-    )
+        stmt = stmt.where(Recipe.is_favorite.is_(True))
+        count_stmt = count_stmt.where(Recipe.is_favorite.is_(True))
+
+    def generate():
+        # Emit recipe-by-recipe: memory stays bounded by one recipe's JSON
+        # instead of the whole favorites list, and the first bytes go out
+        # while later rows are still being serialized.
+        yield b'{"count":%d,"recipes":[' % db.scalar(count_stmt)
+        first = True
+        for recipe in db.scalars(stmt.execution_options(yield_per=64)):
+            if not first:
+                yield b","
+            yield orjson.dumps(serialize_recipe(recipe).model_dump(mode="json"))
+            first = False
+        yield b"]}"
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 
 @app.post("/api/recipes", response_model=schemas.RecipeResponse)
@@ -451,32 +644,37 @@ async def create_recipe(recipe: schemas.RecipeCreate, db: Session = Depends(get_
     db.add(db_recipe)
     db.flush()
 
-    for ing in recipe.ingredients:
-        db.add(RecipeIngredient(
-            recipe_id=db_recipe.id,
-            name=ing.name,
-            amount=ing.amount,
-            unit=ing.unit,
-            notes=ing.notes,
-            item_id=ing.item_id
-        ))
-
-    for step in recipe.steps:
-        db.add(RecipeStep(
-            recipe_id=db_recipe.id,
-            step_number=step.step_number,
-            instruction=step.instruction
-        ))
+    if recipe.ingredients:
+        db.bulk_insert_mappings(RecipeIngredient, [
+            {
+                "recipe_id": db_recipe.id,
+                "name": ing.name,
+                "amount": ing.amount,
+                "unit": ing.unit,
+                "notes": ing.notes,
+                "item_id": ing.item_id,
+            }
+            for ing in recipe.ingredients
+        ])
+
+    if recipe.steps:
+        db.bulk_insert_mappings(RecipeStep, [
+            {
+                "recipe_id": db_recipe.id,
+                "step_number": step.step_number,
+                "instruction": step.instruction,
+            }
+            for step in recipe.steps
+        ])
 
     db.commit()
-    db.refresh(db_recipe)
     return serialize_recipe(db_recipe)
 
 
 @app.get("/api/recipes/{recipe_id}", response_model=schemas.RecipeResponse)
 async def get_recipe(recipe_id: int, db: Session = Depends(get_db)):
     """Get a single recipe by ID."""
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     return serialize_recipe(recipe)
@@ -489,7 +687,7 @@ async def update_recipe(
     db: Session = Depends(get_db)
 ):
     """Update a recipe's metadata (not ingredients/steps)."""
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -497,7 +695,6 @@ async def update_recipe(
         setattr(recipe, field, value)
 
     db.commit()
-    db.refresh(recipe)
     return serialize_recipe(recipe)
 
 
@@ -508,7 +705,7 @@ async def update_recipe_full(
     db: Session = Depends(get_db)
 ):
     """Update a recipe including ingredients and steps."""
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -520,34 +717,77 @@ async def update_recipe_full(
 
     if update.ingredients is not None:
         db.query(RecipeIngredient).filter(RecipeIngredient.recipe_id == recipe_id).delete()
-        for ing in update.ingredients:
-            db.add(RecipeIngredient(
-                recipe_id=recipe_id,
-                name=ing.name,
-                amount=ing.amount,
-                unit=ing.unit,
-                notes=ing.notes,
-                item_id=ing.item_id
-            ))
+        if update.ingredients:
+            db.bulk_insert_mappings(RecipeIngredient, [
+                {
+                    "recipe_id": recipe_id,
+                    "name": ing.name,
+                    "amount": ing.amount,
+                    "unit": ing.unit,
+                    "notes": ing.notes,
+                    "item_id": ing.item_id,
+                }
+                for ing in update.ingredients
+            ])
 
     if update.steps is not None:
         db.query(RecipeStep).filter(RecipeStep.recipe_id == recipe_id).delete()
-        for step in update.steps:
-            db.add(RecipeStep(
-                recipe_id=recipe_id,
-                step_number=step.step_number,
-                instruction=step.instruction
-            ))
+        if update.steps:
+            db.bulk_insert_mappings(RecipeStep, [
+                {
+                    "recipe_id": recipe_id,
+                    "step_number": step.step_number,
+                    "instruction": step.instruction,
+                }
+                for step in update.steps
+            ])
 
     db.commit()
-    db.refresh(recipe)
+    if update.ingredients is not None or update.steps is not None:
+        # The bulk DELETE + executemany above bypass the selectin-loaded
+        # collections; reload them so the response reflects the new rows
+        db.expire(recipe, ["ingredients", "steps"])
     return serialize_recipe(recipe)
 
 
+@app.patch(
+    "/api/recipes/{recipe_id}/ingredients/{ingredient_id}",
+    response_model=schemas.RecipeIngredientResponse,
+)
+async def update_recipe_ingredient_match(
+    recipe_id: int,
+    ingredient_id: int,
+    update: schemas.RecipeIngredientMatchUpdate,
+    db: Session = Depends(get_db)
+):
+    """Link or unlink a single ingredient's item without rewriting the recipe."""
+    ingredient = db.query(RecipeIngredient).filter(
+        RecipeIngredient.id == ingredient_id,
+        RecipeIngredient.recipe_id == recipe_id,
+    ).first()
+    if not ingredient:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+
+    if "item_id" not in update.model_dump(exclude_unset=True):
+        raise HTTPException(status_code=400, detail="item_id is required (use null to unlink)")
+
+    item = None
+    if update.item_id is not None:
+        item = db.get(Item, update.item_id)
+        if item is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+
+    # Assign through the relationship (not the bare FK) so the already-loaded
+    # matched_item stays in sync for the response
+    ingredient.matched_item = item
+    db.commit()
+    return ingredient
+
+
 @app.delete("/api/recipes/{recipe_id}")
 async def delete_recipe(recipe_id: int, db: Session = Depends(get_db)):
     """Delete a recipe."""
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -559,13 +799,12 @@ async def delete_recipe(recipe_id: int, db: Session = Depends(get_db)):
 @app.post("/api/recipes/{recipe_id}/favorite", response_model=schemas.RecipeResponse)
 async def toggle_favorite(recipe_id: int, db: Session = Depends(get_db)):
     """Toggle a recipe's favorite status."""
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     recipe.is_favorite = not recipe.is_favorite
     db.commit()
-    db.refresh(recipe)
     return serialize_recipe(recipe)
 
 
@@ -585,7 +824,7 @@ async def translate_recipe(
     if lang not in {"en", "nl"}:
         raise HTTPException(status_code=400, detail="lang must be 'en' or 'nl'")
 
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -651,6 +890,13 @@ class ImportUrlRequest(schemas.BaseModel):
     url: str
 
 
+# Compiled once: strip scripts/styles, then all tags, then collapse
+# whitespace before handing page text to Gemini
+_SCRIPTISH_RE = re.compile(r"(?is)<(script|style|noscript|svg)[^>]*>.*?</\1>")
+_TAG_RE = re.compile(r"(?is)<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
 @app.post("/api/recipes/import-url", response_model=schemas.RecipeResponse)
 async def import_recipe_from_url(request: ImportUrlRequest, db: Session = Depends(get_db)):
     """
@@ -659,9 +905,6 @@ async def import_recipe_from_url(request: ImportUrlRequest, db: Session = Depend
     Fetches the page and uses Gemini to parse it into a structured Dutch recipe.
     Requires GEMINI_API_KEY.
     """
-    import re
-    import requests as http_requests
-
     if not gemini_service.is_configured():
         raise HTTPException(
             status_code=503,
@@ -673,7 +916,10 @@ async def import_recipe_from_url(request: ImportUrlRequest, db: Session = Depend
         raise HTTPException(status_code=400, detail="URL must start with http:// or https://")
 
     try:
-        page = http_requests.get(
+        # Blocking I/O in an async handler would stall the event loop for
+        # every other request; run the fetch on the threadpool instead.
+        page = await run_in_threadpool(
+            http_requests.get,
             url,
             timeout=15,
             headers={"User-Agent": "HomeInventoryManager/1.0 (recipe-import)"},
@@ -683,15 +929,13 @@ async def import_recipe_from_url(request: ImportUrlRequest, db: Session = Depend
         raise HTTPException(status_code=502, detail=f"Could not fetch URL: {e}") from e
 
     # Strip scripts/styles to keep the Gemini prompt smaller
-    text_body = re.sub(
-        r"(?is)<(script|style|noscript|svg)[^>]*>.*?</\1>",
-        " ",
-        page.text,
-    )
-    text_body = re.sub(r"(?is)<[^>]+>", " ", text_body)
-    text_body = re.sub(r"\s+", " ", text_body).strip()
+    text_body = _SCRIPTISH_RE.sub(" ", page.text)
+    text_body = _TAG_RE.sub(" ", text_body)
+    text_body = _WHITESPACE_RE.sub(" ", text_body).strip()
 
-    local_data = gemini_service.parse_recipe_from_url_content(url, text_body)
+    local_data = await run_in_threadpool(
+        gemini_service.parse_recipe_from_url_content, url, text_body
+    )
     if local_data.get("error") and not local_data.get("ingredients") and not local_data.get("steps"):
         raise HTTPException(status_code=500, detail=f"Failed to parse recipe: {local_data['error']}")
 
@@ -707,34 +951,64 @@ async def import_recipe_from_url(request: ImportUrlRequest, db: Session = Depend
     db.add(db_recipe)
     db.flush()
 
-    for ing in local_data.get("ingredients", []):
-        if not ing.get("name"):
-            continue
-        db.add(RecipeIngredient(
-            recipe_id=db_recipe.id,
-            name=ing.get("name", ""),
-            amount=str(ing["amount"]) if ing.get("amount") is not None else None,
-            unit=ing.get("unit"),
-            notes=ing.get("notes"),
-        ))
-
-    for step in local_data.get("steps", []):
-        instruction = step.get("instruction") or ""
-        if not instruction:
-            continue
-        db.add(RecipeStep(
-            recipe_id=db_recipe.id,
-            step_number=int(step.get("step_number") or 1),
-            instruction=instruction,
-        ))
+    ingredient_rows = [
+        {
+            "recipe_id": db_recipe.id,
+            "name": ing.get("name", ""),
+            "amount": str(ing["amount"]) if ing.get("amount") is not None else None,
+            "unit": ing.get("unit"),
+            "notes": ing.get("notes"),
+        }
+        for ing in local_data.get("ingredients", [])
+        if ing.get("name")
+    ]
+    if ingredient_rows:
+        db.bulk_insert_mappings(RecipeIngredient, ingredient_rows)
+
+    step_rows = [
+        {
+            "recipe_id": db_recipe.id,
+            "step_number": int(step.get("step_number") or 1),
+            "instruction": step.get("instruction") or "",
+        }
+        for step in local_data.get("steps", [])
+        if step.get("instruction")
+    ]
+    if step_rows:
+        db.bulk_insert_mappings(RecipeStep, step_rows)
 
     db.commit()
-    db.refresh(db_recipe)
     return serialize_recipe(db_recipe)
 
 
 # --- Gemini AI Endpoints ---
 
+# Suggestions for an identical inventory + query are reusable for a while;
+# a hit skips a slow (and metered) Gemini round-trip entirely.
+_AI_CACHE_TTL = 3600.0
+_AI_CACHE_MAX = 256
+_ai_cache: OrderedDict = OrderedDict()
+
+
+def _ai_cache_get(key):
+    entry = _ai_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if time.monotonic() > expires_at:
+        del _ai_cache[key]
+        return None
+    _ai_cache.move_to_end(key)
+    return value
+
+
+def _ai_cache_put(key, value) -> None:
+    _ai_cache[key] = (time.monotonic() + _AI_CACHE_TTL, value)
+    _ai_cache.move_to_end(key)
+    while len(_ai_cache) > _AI_CACHE_MAX:
+        _ai_cache.popitem(last=False)
+
+
 class RecipeSuggestionRequest(schemas.BaseModel):
     """Request body for recipe suggestions."""
     query: Optional[str] = None  # e.g., "soup recipes", "quick dinner", "vegetarian"
@@ -758,10 +1032,12 @@ async def get_recipe_suggestions(
         )
     
     # Get inventory items
-    inventory_items = db.query(Item).filter(
-        Item.location == ItemLocation.INVENTORY
-    ).all()
-    item_names = [item.name for item in inventory_items]
+    item_names = [
+        name
+        for (name,) in db.query(Item.name).filter(
+            Item.location == ItemLocation.INVENTORY
+        ).order_by(Item.name)
+    ]
     
     if not item_names:
         raise HTTPException(
@@ -771,13 +1047,19 @@ async def get_recipe_suggestions(
     
     # Extract query from request
     query = request.query if request else None
-    
+
+    cache_key = ("recipes", tuple(sorted(item_names)), query)
+    cached = _ai_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     # Get suggestions from Gemini
     result = gemini_service.generate_recipe_suggestions(item_names, query)
-    
+
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
-    
+
+    _ai_cache_put(cache_key, result)
     return result
 
 
@@ -798,10 +1080,12 @@ async def get_grocery_suggestions(
         )
     
     # Get inventory items
-    inventory_items = db.query(Item).filter(
-        Item.location == ItemLocation.INVENTORY
-    ).all()
-    item_names = [item.name for item in inventory_items]
+    item_names = [
+        name
+        for (name,) in db.query(Item.name).filter(
+            Item.location == ItemLocation.INVENTORY
+        ).order_by(Item.name)
+    ]
     
     # Get favorite recipes with their ingredients
     favorite_recipes = db.query(Recipe).filter(Recipe.is_favorite.is_(True)).all()
@@ -815,49 +1099,126 @@ async def get_grocery_suggestions(
             ]
         })
     
+    cache_key = (
+        "grocery",
+        tuple(sorted(item_names)),
+        json.dumps(recipes_data, sort_keys=True),
+        preferences,
+    )
+    cached = _ai_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     # Get suggestions from Gemini
     result = gemini_service.generate_grocery_suggestions(item_names, recipes_data, preferences)
-    
+
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
-    
+
+    _ai_cache_put(cache_key, result)
     return result
 
 
 
 # --- Beautiful Recipe View Page ---
 
+# The recipe page template compiles to Python bytecode once at import;
+# rendering becomes a sequence of string joins instead of a giant per-request
+# f-string, and autoescaping closes the HTML-injection holes of raw
+# interpolation.
+_jinja_env = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), "templates")),
+    autoescape=select_autoescape(("html",)),
+    auto_reload=False,
+)
+# |tojson goes through orjson as well; Jinja still applies its own HTML-safe
+# escaping on top of whatever dumps function is configured.
+_jinja_env.policies["json.dumps_function"] = lambda obj, **_kwargs: orjson.dumps(obj).decode()
+_jinja_env.policies["json.dumps_kwargs"] = {}
+RECIPE_TEMPLATE = _jinja_env.get_template("recipe.html")
+
+# Content-hash version for the externalized stylesheet: busts the client
+# cache exactly when the file changes.
+_RECIPE_CSS_PATH = os.path.join(static_path, "recipe.css")
+try:
+    with open(_RECIPE_CSS_PATH, "rb") as _css_file:
+        _RECIPE_CSS_VERSION = hashlib.blake2b(_css_file.read(), digest_size=4).hexdigest()
+except OSError:
+    _RECIPE_CSS_VERSION = "0"
+
+# The dropdown item list and inventory membership sets are shared by every
+# recipe page at a given data version; cache them so rendering several
+# recipes between writes scans the items table once.
+_item_rows_cache = None
+
+
+def _load_item_rows(db: Session):
+    global _item_rows_cache
+    version = data_version()
+    cached = _item_rows_cache
+    if cached is not None and cached[0] == version:
+        return cached[1], cached[2], cached[3]
+
+    item_rows = db.query(Item.id, Item.name, Item.location).order_by(Item.name).all()
+    all_items = [
+        {"id": item_id, "name": name, "location": location.value}
+        for item_id, name, location in item_rows
+    ]
+    inventory_item_ids = set()
+    inventory_names = set()
+    for item_id, name, location in item_rows:
+        if location == ItemLocation.INVENTORY:
+            inventory_item_ids.add(item_id)
+            inventory_names.add(name.lower())
+
+    _item_rows_cache = (version, all_items, inventory_item_ids, inventory_names)
+    return all_items, inventory_item_ids, inventory_names
+
+
+# Fully rendered pages keyed by (recipe_id, kiosk). An entry is valid only
+# for the data version it was rendered at, so any committed write anywhere
+# invalidates it; recipes are viewed far more often than anything changes.
+_PAGE_CACHE_MAX = 256
+_page_cache: OrderedDict = OrderedDict()
+
+NUTRIENT_LABELS = [
+    ("energy_kcal", "Energie", "kcal"),
+    ("proteins", "Eiwitten", "g"),
+    ("carbohydrates", "Koolhydraten", "g"),
+    ("fat", "Vetten", "g"),
+    ("saturated-fat", "Verzadigde vetten", "g"),
+    ("sugars", "Suikers", "g"),
+    ("fiber", "Vezels", "g"),
+    ("salt", "Zout", "g"),
+]
+
+
 @app.get("/recipe/{recipe_id}", response_class=HTMLResponse, include_in_schema=False)
-async def view_recipe_page(recipe_id: int, kiosk: bool = False, db: Session = Depends(get_db)):
+async def view_recipe_page(request: Request, recipe_id: int, kiosk: bool = False, db: Session = Depends(get_db)):
     """Serve a beautiful, user-friendly recipe viewing page."""
-    recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    version = data_version()
+    cache_key = (recipe_id, kiosk)
+    cached = _page_cache.get(cache_key)
+    if cached is not None and cached[0] == version:
+        _page_cache.move_to_end(cache_key)
+        _cached_version, body, etag = cached
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return HTMLResponse(content=body, headers={"ETag": etag})
+
+    recipe = db.get(Recipe, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    
-    # Get all items for dropdown (sorted by name)
-    all_items = db.query(Item).order_by(Item.name).all()
-    # Get inventory item IDs for availability check
-    inventory_item_ids = {item.id for item in all_items if item.location == ItemLocation.INVENTORY}
-    inventory_names = {item.name.lower() for item in all_items if item.location == ItemLocation.INVENTORY}
-    
-    # Sort steps by step_number
+
+    all_items, inventory_item_ids, inventory_names = _load_item_rows(db)
+
     sorted_steps = sorted(recipe.steps, key=lambda s: s.step_number)
-    
-    # Build ingredient data for JSON and HTML
-    import html as html_module
+
+    ingredient_rows = []
     ingredient_data = []
-    ingredients_html = ""
     missing_ingredients = []
-    
+
     for ing in recipe.ingredients:
-        amount_str = f"{ing.amount} " if ing.amount else ""
-        unit_str = f"{ing.unit} " if ing.unit else ""
-        notes_html = (
-            f" <span class='notes' data-ing-notes='{ing.id}'>"
-            f"{'(' + ing.notes + ')' if ing.notes else ''}"
-            f"</span>"
-        )
-        
         # Check availability: prefer item_id match, fallback to name match
         if ing.item_id and ing.matched_item:
             is_available = ing.item_id in inventory_item_ids
@@ -865,38 +1226,22 @@ async def view_recipe_page(recipe_id: int, kiosk: bool = False, db: Session = De
         else:
             is_available = ing.name.lower() in inventory_names
             matched_name = None
-        
-        status_icon = ("" if kiosk else ("✓" if is_available else "✗"))
-        status_class = "available" if is_available else "missing"
-        
-        # Show matched item if different from ingredient name
-        match_info = ""
-        if matched_name and matched_name.lower() != ing.name.lower():
-            match_info = f" <span class='matched-to'>→ {matched_name}</span>"
-        
+
         if not is_available:
             missing_ingredients.append({
                 "name": ing.name,
                 "item_id": ing.item_id
             })
-        
-        if kiosk:
-            ingredients_html += f"""<li class='{status_class}' data-ing-id='{ing.id}'>
-            <span class='status-icon'>{status_icon}</span>
-            <div class='ingredient-content'>
-                {amount_str}{unit_str}<span class='ing-name' data-ing-name='{ing.id}'>{ing.name}</span>{notes_html}{match_info}
-            </div>
-        </li>"""
-        else:
-            ingredients_html += f"""<li class='{status_class}' data-ing-id='{ing.id}'>
-            <span class='status-icon'>{status_icon}</span>
-            <div class='ingredient-content' onclick='openIngredientDropdown({ing.id})'>
-                {amount_str}{unit_str}<span class='ing-name' data-ing-name='{ing.id}'>{ing.name}</span>{notes_html}{match_info}
-            </div>
-            <div class='ingredient-dropdown' id='dropdown-{ing.id}'></div>
-        </li>"""
-        
-        # Store ingredient data for JS
+
+        ingredient_rows.append({
+            "ing": ing,
+            "available": is_available,
+            "matched_name": matched_name,
+            # Only label the match when it differs from the ingredient name
+            "show_match": bool(matched_name and matched_name.lower() != ing.name.lower()),
+        })
+
+        # Ingredient data for JS
         ingredient_data.append({
             "id": ing.id,
             "name": ing.name,
@@ -905,1706 +1250,46 @@ async def view_recipe_page(recipe_id: int, kiosk: bool = False, db: Session = De
             "notes": ing.notes or "",
             "item_id": ing.item_id
         })
-    
-    # Generate steps HTML
-    steps_html = ""
-    for step in sorted_steps:
-        steps_html += (
-            f"<li data-step-number='{step.step_number}'>"
-            f"<span class='step-text'>{step.instruction}</span></li>"
-        )
-    
+
     # Calculate total time
     total_time = (recipe.prep_time_minutes or 0) + (recipe.cook_time_minutes or 0)
-    time_str = f"{total_time} min" if total_time else "—"
-    
-    # JSON data for JavaScript
-    missing_json = json.dumps(missing_ingredients)
-    ingredients_json = json.dumps(ingredient_data)
-    items_json = json.dumps([
-        {"id": item.id, "name": item.name, "location": item.location.value}
-        for item in all_items
-    ])
-    
-    # Availability summary
-    total_ingredients = len(recipe.ingredients)
-    available_count = total_ingredients - len(missing_ingredients)
-    
-    if total_ingredients == 0:
-        availability_html = ""
-    elif len(missing_ingredients) == 0:
-        prefix = "" if kiosk else "✓ "
-        availability_html = f'<div class="availability-banner complete">{prefix}Alle {total_ingredients} ingrediënten in voorraad!</div>'
-    else:
-        prefix = "" if kiosk else "◐ "
-        grocery_label = (
-            f"{len(missing_ingredients)} ontbrekende toevoegen aan boodschappen"
-            if kiosk
-            else f"🛒 {len(missing_ingredients)} ontbrekende toevoegen aan boodschappen"
-        )
-        availability_html = f'''
-        <div class="availability-banner partial">
-            <span>{prefix}{available_count}/{total_ingredients} ingrediënten in voorraad</span>
-            <button class="add-missing-btn" onclick="addMissingToGrocery()">
-                {grocery_label}
-            </button>
-        </div>
-        '''
+    time_str = f"{total_time} min" if total_time else "\u2014"
 
     nutrition = recipe_nutrition_summary(recipe)
-    totals = nutrition.totals
-    per_100g = nutrition.per_100g
-    nutrient_labels = [
-        ("energy_kcal", "Energie", "kcal"),
-        ("proteins", "Eiwitten", "g"),
-        ("carbohydrates", "Koolhydraten", "g"),
-        ("fat", "Vetten", "g"),
-        ("saturated-fat", "Verzadigde vetten", "g"),
-        ("sugars", "Suikers", "g"),
-        ("fiber", "Vezels", "g"),
-        ("salt", "Zout", "g"),
-    ]
-
-    def _nutrition_rows(values: dict, labels=nutrient_labels) -> str:
-        rows = []
-        for key, label, unit in labels:
-            if key in values and values[key] is not None:
-                display = f"{values[key]} {unit}"
-            else:
-                display = "—"
-            rows.append(
-                f"<div class='nutrition-row' data-nutrient='{key}'>"
-                f"<span data-i18n-nutrient-label='{key}'>{label}</span>"
-                f"<span>{display}</span></div>"
-            )
-        return "".join(rows)
-
-    totals_rows = _nutrition_rows(totals)
-    per100_rows = _nutrition_rows(per_100g)
-
-    allergens_html = ""
-    if nutrition.allergens:
-        chips = "".join(f"<span class='allergen-chip'>{a}</span>" for a in nutrition.allergens)
-        allergens_html = (
-            "<div class='allergens'>"
-            "<div class='allergens-label' data-i18n='allergens'>Allergenen</div>"
-            f"<div class='allergen-chips'>{chips}</div></div>"
-        )
 
-    skipped_note = ""
-    if nutrition.ingredients_skipped:
-        skipped_note = (
-            f"<p class='nutrition-note'>Geen productdata voor: "
-            f"{', '.join(nutrition.ingredients_skipped)}</p>"
-        )
-
-    totals_block = (
-        f"<h3 class='nutrition-subtitle' data-i18n='recipe_total'>Totaal recept</h3>"
-        f"<div class='nutrition-box' id='nutrition-totals'>{totals_rows}</div>"
-    )
-    per100_block = (
-        f"<h3 class='nutrition-subtitle' data-i18n='per_100g'>Per 100 g</h3>"
-        f"<div class='nutrition-box' id='nutrition-per100'>{per100_rows}</div>"
+    html = RECIPE_TEMPLATE.render(
+        recipe=recipe,
+        kiosk=kiosk,
+        css_version=_RECIPE_CSS_VERSION,
+        back_href=f"/kiosk?tab=recipes&recipe={recipe.id}" if kiosk else f"/?tab=recipes&recipe={recipe.id}",
+        time_str=time_str,
+        sorted_steps=sorted_steps,
+        steps_data=[
+            {"step_number": s.step_number, "instruction": s.instruction}
+            for s in sorted_steps
+        ],
+        ingredients=ingredient_rows,
+        ingredient_data=ingredient_data,
+        missing_ingredients=missing_ingredients,
+        total_ingredients=len(recipe.ingredients),
+        available_count=len(recipe.ingredients) - len(missing_ingredients),
+        missing_count=len(missing_ingredients),
+        nutrition=nutrition,
+        nutrient_labels=NUTRIENT_LABELS,
+        all_items=all_items,
+        source_label="Bekijk origineel recept \u2192" if kiosk else "\U0001f4ce Bekijk origineel recept \u2192",
     )
 
-    nutrition_html = f"""
-        <h2 data-i18n="nutrition">Voedingswaarden</h2>
-        <p class="nutrition-note">Op basis van gekoppelde voorraaditems (actieve barcode).</p>
-        {per100_block}
-        {totals_block}
-        {allergens_html}
-        {skipped_note}
-        """
-
-    source_label = "Bekijk origineel recept →" if kiosk else "📎 Bekijk origineel recept →"
-    source_label_js = json.dumps(source_label)
-    back_href = f"/kiosk?tab=recipes&recipe={recipe.id}" if kiosk else f"/?tab=recipes&recipe={recipe.id}"
-    body_class = "kiosk" if kiosk else ""
-
-    html = f"""
-<!DOCTYPE html>
-<html lang="nl">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{recipe.name}</title>
-    <link href="https://fonts.googleapis.com/css2?family=Crimson+Pro:wght@400;600&family=Inter:wght@400;500&display=swap" rel="stylesheet">
-    <style>
-        :root {{
-            --bg: #faf9f7;
-            --text: #1a1a1a;
-            --text-muted: #666;
-            --accent: #c45c26;
-            --accent-green: #3fb950;
-            --accent-red: #f85149;
-            --accent-blue: #58a6ff;
-            --border: #e5e3df;
-        }}
-        
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        
-        body {{
-            font-family: 'Inter', sans-serif;
-            background: var(--bg);
-            color: var(--text);
-            line-height: 1.7;
-            padding: 2rem 1rem;
-            max-width: 680px;
-            margin: 0 auto;
-            padding-bottom: 5rem;
-        }}
-        
-        .header-row {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 2rem;
-        }}
-        
-        .back-link {{
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-            color: var(--text-muted);
-            text-decoration: none;
-            font-size: 0.875rem;
-        }}
-        
-        .back-link:hover {{ color: var(--accent); }}
-        
-        .edit-btn {{
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.5rem 1rem;
-            background: #fff;
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            color: var(--text);
-            font-size: 0.875rem;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        
-        .edit-btn:hover {{
-            border-color: var(--accent);
-            color: var(--accent);
-        }}
-        
-        .edit-btn.active {{
-            background: var(--accent);
-            border-color: var(--accent);
-            color: #fff;
-        }}
-        
-        h1 {{
-            font-family: 'Crimson Pro', serif;
-            font-size: 2.5rem;
-            font-weight: 600;
-            margin-bottom: 0.5rem;
-            line-height: 1.2;
-        }}
-        
-        .description {{
-            color: var(--text-muted);
-            font-size: 1.1rem;
-            margin-bottom: 1.5rem;
-        }}
-        
-        .meta {{
-            display: flex;
-            gap: 2rem;
-            padding: 1rem 0;
-            border-top: 1px solid var(--border);
-            border-bottom: 1px solid var(--border);
-            margin-bottom: 2rem;
-        }}
-        
-        .meta-item {{
-            display: flex;
-            flex-direction: column;
-        }}
-        
-        .meta-label {{
-            font-size: 0.75rem;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            color: var(--text-muted);
-        }}
-        
-        .meta-value {{
-            font-size: 1.125rem;
-            font-weight: 500;
-        }}
-        
-        h2 {{
-            font-family: 'Crimson Pro', serif;
-            font-size: 1.5rem;
-            font-weight: 600;
-            margin: 2rem 0 1rem;
-            color: var(--accent);
-        }}
-        
-        .availability-banner {{
-            padding: 0.75rem 1rem;
-            border-radius: 8px;
-            margin-bottom: 1rem;
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            flex-wrap: wrap;
-            gap: 0.5rem;
-        }}
-        
-        .availability-banner.complete {{
-            background: rgba(63, 185, 80, 0.15);
-            color: var(--accent-green);
-        }}
-        
-        .availability-banner.partial {{
-            background: rgba(210, 153, 34, 0.15);
-            color: #bf8a1f;
-        }}
-        
-        .add-missing-btn {{
-            background: var(--accent);
-            color: #fff;
-            border: none;
-            padding: 0.5rem 1rem;
-            border-radius: 6px;
-            font-size: 0.85rem;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        
-        .add-missing-btn:hover {{
-            opacity: 0.9;
-            transform: scale(1.02);
-        }}
-        
-        .add-missing-btn:disabled {{
-            opacity: 0.5;
-            cursor: not-allowed;
-        }}
-        
-        .ingredients {{
-            background: #fff;
-            border: 1px solid var(--border);
-            border-radius: 12px;
-            padding: 1.5rem;
-        }}
-        
-        .ingredients ul {{
-            list-style: none;
-        }}
-        
-        .ingredients li {{
-            padding: 0.5rem 0;
-            border-bottom: 1px solid var(--border);
-            display: flex;
-            align-items: flex-start;
-            gap: 0.5rem;
-            position: relative;
-        }}
-        
-        .ingredients li:last-child {{ border-bottom: none; }}
-        
-        .ingredients li.available .status-icon {{ color: var(--accent-green); }}
-        .ingredients li.missing .status-icon {{ color: var(--accent-red); }}
-        .ingredients li.missing {{ color: var(--text-muted); }}
-        
-        body.kiosk .status-icon {{
-            display: inline-block;
-            width: 0.55rem;
-            height: 0.55rem;
-            border-radius: 50%;
-            background: currentColor;
-            flex-shrink: 0;
-            margin-top: 0.45rem;
-        }}
-        
-        body.kiosk .ingredient-content {{
-            cursor: default;
-        }}
-        
-        body.kiosk .ingredient-content::after {{
-            display: none;
-        }}
-        
-        body.kiosk .no-kiosk {{
-            display: none !important;
-        }}
-        
-        .matched-to {{
-            color: var(--text-muted);
-            font-size: 0.85rem;
-            font-style: italic;
-        }}
-
-        .nutrition-box {{
-            background: var(--card);
-            border: 1px solid var(--border);
-            border-radius: 12px;
-            padding: 1rem 1.25rem;
-            margin-bottom: 1rem;
-        }}
-        .nutrition-row {{
-            display: flex;
-            justify-content: space-between;
-            padding: 0.4rem 0;
-            border-bottom: 1px solid var(--border);
-            font-size: 0.95rem;
-        }}
-        .nutrition-row:last-child {{ border-bottom: none; }}
-        .nutrition-note {{
-            font-size: 0.8rem;
-            color: var(--text-muted);
-            margin: 0.5rem 0 1rem;
-        }}
-        .nutrition-subtitle {{
-            font-family: 'Inter', sans-serif;
-            font-size: 0.95rem;
-            font-weight: 600;
-            margin: 1rem 0 0.5rem;
-            color: var(--text);
-        }}
-        .lang-toggle {{
-            display: inline-flex;
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            overflow: hidden;
-            margin-right: 0.5rem;
-        }}
-        .lang-toggle button {{
-            border: none;
-            background: #fff;
-            padding: 0.4rem 0.75rem;
-            cursor: pointer;
-            font-size: 0.8rem;
-            color: var(--text-muted);
-        }}
-        .lang-toggle button.active {{
-            background: var(--accent);
-            color: #fff;
-        }}
-        .header-actions {{
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }}
-        .allergens {{ margin: 1rem 0; }}
-        .allergens-label {{
-            font-size: 0.8rem;
-            color: var(--text-muted);
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            margin-bottom: 0.5rem;
-        }}
-        .allergen-chips {{ display: flex; flex-wrap: wrap; gap: 0.4rem; }}
-        .allergen-chip {{
-            background: #fde8e4;
-            color: #9a3412;
-            padding: 0.25rem 0.6rem;
-            border-radius: 999px;
-            font-size: 0.8rem;
-        }}
-        
-        /* Clickable ingredient styling */
-        .ingredient-content {{
-            flex: 1;
-            cursor: pointer;
-            padding: 0.25rem 0.5rem;
-            margin: -0.25rem 0;
-            border-radius: 6px;
-            transition: background 0.15s;
-            position: relative;
-        }}
-        
-        .ingredient-content:hover {{
-            background: rgba(196, 92, 38, 0.08);
-        }}
-        
-        .ingredient-content::after {{
-            content: '✎';
-            position: absolute;
-            right: 0.5rem;
-            top: 50%;
-            transform: translateY(-50%);
-            opacity: 0;
-            font-size: 0.8rem;
-            color: var(--text-muted);
-            transition: opacity 0.15s;
-        }}
-        
-        .ingredient-content:hover::after {{
-            opacity: 1;
-        }}
-        
-        /* Ingredient dropdown */
-        .ingredient-dropdown {{
-            position: absolute;
-            top: 100%;
-            left: 0;
-            right: 0;
-            background: #fff;
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            box-shadow: 0 8px 24px rgba(0,0,0,0.15);
-            z-index: 100;
-            margin-top: 4px;
-            display: none;
-        }}
-        
-        .ingredient-dropdown.active {{
-            display: block;
-        }}
-        
-        .dropdown-search {{
-            padding: 0.75rem;
-            border-bottom: 1px solid var(--border);
-        }}
-        
-        .dropdown-search input {{
-            width: 100%;
-            padding: 0.5rem 0.75rem;
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            font-size: 0.9rem;
-            outline: none;
-        }}
-        
-        .dropdown-search input:focus {{
-            border-color: var(--accent);
-        }}
-        
-        .dropdown-items {{
-            max-height: 200px;
-            overflow-y: auto;
-        }}
-        
-        .dropdown-item {{
-            padding: 0.6rem 0.75rem;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-            transition: background 0.1s;
-        }}
-        
-        .dropdown-item:hover {{
-            background: rgba(196, 92, 38, 0.08);
-        }}
-        
-        .dropdown-item.selected {{
-            background: rgba(196, 92, 38, 0.15);
-        }}
-        
-        .dropdown-item .item-icon {{
-            font-size: 0.7rem;
-            color: var(--text-muted);
-            min-width: 5.5rem;
-            text-transform: uppercase;
-            letter-spacing: 0.02em;
-        }}
-        
-        .dropdown-item .item-name {{
-            flex: 1;
-        }}
-        
-        .dropdown-item.no-match {{
-            color: var(--text-muted);
-            font-style: italic;
-        }}
-        
-        .dropdown-footer {{
-            padding: 0.75rem;
-            border-top: 1px solid var(--border);
-            display: flex;
-            gap: 0.5rem;
-        }}
-        
-        .dropdown-footer button {{
-            flex: 1;
-            padding: 0.5rem;
-            border-radius: 6px;
-            font-size: 0.85rem;
-            cursor: pointer;
-            transition: all 0.15s;
-        }}
-        
-        .btn-add-grocery {{
-            background: var(--accent);
-            color: #fff;
-            border: none;
-        }}
-        
-        .btn-add-grocery:hover {{
-            opacity: 0.9;
-        }}
-        
-        .btn-clear-match {{
-            background: transparent;
-            border: 1px solid var(--border);
-            color: var(--text-muted);
-        }}
-        
-        .btn-clear-match:hover {{
-            border-color: var(--accent-red);
-            color: var(--accent-red);
-        }}
-        
-        .ingredients .notes {{
-            color: var(--text-muted);
-            font-size: 0.9rem;
-        }}
-        
-        .steps ol {{
-            padding-left: 1.5rem;
-        }}
-        
-        .steps li {{
-            padding: 0.75rem 0;
-            padding-left: 0.5rem;
-        }}
-        
-        .steps li::marker {{
-            color: var(--accent);
-            font-weight: 600;
-        }}
-        
-        .favorite {{
-            position: fixed;
-            bottom: 2rem;
-            right: 2rem;
-            width: 56px;
-            height: 56px;
-            border-radius: 50%;
-            background: {'var(--accent)' if recipe.is_favorite else '#fff'};
-            color: {'#fff' if recipe.is_favorite else 'var(--accent)'};
-            border: 2px solid var(--accent);
-            font-size: 1.5rem;
-            cursor: pointer;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-            transition: all 0.2s;
-        }}
-        
-        .favorite:hover {{
-            transform: scale(1.1);
-        }}
-        
-        .toast {{
-            position: fixed;
-            bottom: 6rem;
-            left: 50%;
-            transform: translateX(-50%);
-            background: #333;
-            color: #fff;
-            padding: 0.75rem 1.5rem;
-            border-radius: 8px;
-            font-size: 0.9rem;
-            display: none;
-            z-index: 1000;
-        }}
-        
-        .toast.show {{
-            display: block;
-            animation: fadeInUp 0.3s ease-out;
-        }}
-        
-        @keyframes fadeInUp {{
-            from {{ opacity: 0; transform: translate(-50%, 1rem); }}
-            to {{ opacity: 1; transform: translate(-50%, 0); }}
-        }}
-        
-        /* Edit Mode Styles */
-        .edit-form-group {{
-            margin-bottom: 1rem;
-        }}
-        
-        .edit-label {{
-            display: block;
-            font-size: 0.8rem;
-            color: var(--text-muted);
-            margin-bottom: 0.25rem;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-        }}
-        
-        .edit-input, .edit-textarea {{
-            width: 100%;
-            padding: 0.75rem;
-            font-size: 1rem;
-            font-family: inherit;
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            background: #fff;
-            color: var(--text);
-            transition: border-color 0.2s;
-        }}
-        
-        .edit-input:focus, .edit-textarea:focus {{
-            outline: none;
-            border-color: var(--accent);
-        }}
-        
-        .edit-textarea {{
-            min-height: 80px;
-            resize: vertical;
-        }}
-        
-        .edit-input-small {{
-            width: 100px;
-            padding: 0.5rem;
-            font-size: 0.9rem;
-        }}
-        
-        .edit-row {{
-            display: flex;
-            gap: 1rem;
-            flex-wrap: wrap;
-        }}
-        
-        .edit-row .edit-form-group {{
-            flex: 1;
-            min-width: 80px;
-        }}
-        
-        .edit-section {{
-            background: #fff;
-            border: 1px solid var(--border);
-            border-radius: 12px;
-            padding: 1.5rem;
-            margin-bottom: 1.5rem;
-        }}
-        
-        .edit-section-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1rem;
-        }}
-        
-        .edit-section-title {{
-            font-family: 'Crimson Pro', serif;
-            font-size: 1.25rem;
-            font-weight: 600;
-            color: var(--accent);
-        }}
-        
-        .add-btn {{
-            display: inline-flex;
-            align-items: center;
-            gap: 0.25rem;
-            padding: 0.4rem 0.75rem;
-            background: var(--accent);
-            color: #fff;
-            border: none;
-            border-radius: 6px;
-            font-size: 0.8rem;
-            cursor: pointer;
-            transition: opacity 0.2s;
-        }}
-        
-        .add-btn:hover {{
-            opacity: 0.9;
-        }}
-        
-        .edit-item {{
-            display: flex;
-            gap: 0.5rem;
-            align-items: flex-start;
-            padding: 0.75rem;
-            background: var(--bg);
-            border-radius: 8px;
-            margin-bottom: 0.5rem;
-        }}
-        
-        .edit-item-content {{
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            gap: 0.5rem;
-        }}
-        
-        .edit-item-row {{
-            display: flex;
-            gap: 0.5rem;
-        }}
-        
-        .edit-item-row input {{
-            flex: 1;
-            padding: 0.5rem;
-            font-size: 0.9rem;
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            background: #fff;
-        }}
-        
-        .edit-item-row input:focus {{
-            outline: none;
-            border-color: var(--accent);
-        }}
-        
-        .edit-item-row input.amount-input {{ max-width: 70px; }}
-        .edit-item-row input.unit-input {{ max-width: 80px; }}
-        
-        .remove-btn {{
-            padding: 0.5rem;
-            background: transparent;
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            color: var(--text-muted);
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        
-        .remove-btn:hover {{
-            border-color: var(--accent-red);
-            color: var(--accent-red);
-        }}
-        
-        .step-number {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            width: 28px;
-            height: 28px;
-            background: var(--accent);
-            color: #fff;
-            border-radius: 50%;
-            font-size: 0.85rem;
-            font-weight: 600;
-            flex-shrink: 0;
-        }}
-        
-        .step-textarea {{
-            flex: 1;
-            padding: 0.5rem;
-            font-size: 0.9rem;
-            font-family: inherit;
-            border: 1px solid var(--border);
-            border-radius: 6px;
-            background: #fff;
-            min-height: 60px;
-            resize: vertical;
-        }}
-        
-        .step-textarea:focus {{
-            outline: none;
-            border-color: var(--accent);
-        }}
-        
-        .save-bar {{
-            position: fixed;
-            bottom: 0;
-            left: 0;
-            right: 0;
-            background: #fff;
-            border-top: 1px solid var(--border);
-            padding: 1rem;
-            display: flex;
-            justify-content: center;
-            gap: 1rem;
-            z-index: 200;
-            box-shadow: 0 -4px 12px rgba(0,0,0,0.1);
-        }}
-        
-        .save-bar button {{
-            padding: 0.75rem 2rem;
-            font-size: 1rem;
-            border-radius: 8px;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        
-        .cancel-btn {{
-            background: #fff;
-            border: 1px solid var(--border);
-            color: var(--text);
-        }}
-        
-        .cancel-btn:hover {{
-            border-color: var(--accent-red);
-            color: var(--accent-red);
-        }}
-        
-        .save-btn {{
-            background: var(--accent-green);
-            border: none;
-            color: #fff;
-        }}
-        
-        .save-btn:hover {{
-            opacity: 0.9;
-        }}
-        
-        .save-btn:disabled {{
-            opacity: 0.5;
-            cursor: not-allowed;
-        }}
-        
-        /* View mode hidden when editing */
-        .view-mode {{ display: block; }}
-        .edit-mode {{ display: none; }}
-        
-        body.editing .view-mode {{ display: none; }}
-        body.editing .edit-mode {{ display: block; }}
-        body.editing .favorite {{ display: none; }}
-        
-        .delete-recipe-btn {{
-            background: transparent;
-            border: 1px solid var(--accent-red);
-            color: var(--accent-red);
-            padding: 0.5rem 1rem;
-            border-radius: 6px;
-            font-size: 0.85rem;
-            cursor: pointer;
-            transition: all 0.2s;
-            margin-top: 1rem;
-        }}
-        
-        .delete-recipe-btn:hover {{
-            background: var(--accent-red);
-            color: #fff;
-        }}
-        
-        .source-link {{
-            margin-top: 2rem;
-            padding: 1rem;
-            background: #fff;
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            text-align: center;
-        }}
-        
-        .source-link button {{
-            background: none;
-            border: none;
-            color: var(--accent);
-            text-decoration: none;
-            font-size: 0.9rem;
-            font-weight: 500;
-            font-family: inherit;
-            cursor: pointer;
-            transition: opacity 0.2s;
-        }}
-        
-        .source-link button:hover {{
-            opacity: 0.8;
-            text-decoration: underline;
-        }}
-        
-        .source-overlay {{
-            display: none;
-            position: fixed;
-            inset: 0;
-            z-index: 500;
-            background: var(--bg);
-            flex-direction: column;
-        }}
-        
-        .source-overlay.active {{
-            display: flex;
-        }}
-        
-        .source-overlay-bar {{
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            gap: 0.75rem;
-            padding: 0.75rem 1rem;
-            background: #fff;
-            border-bottom: 1px solid var(--border);
-            flex-shrink: 0;
-        }}
-        
-        .source-overlay-bar .back-btn {{
-            display: inline-flex;
-            align-items: center;
-            gap: 0.35rem;
-            padding: 0.5rem 0.85rem;
-            background: var(--accent);
-            color: #fff;
-            border: none;
-            border-radius: 8px;
-            font-size: 0.875rem;
-            font-weight: 500;
-            font-family: inherit;
-            cursor: pointer;
-        }}
-        
-        .source-overlay-bar .back-btn:hover {{
-            opacity: 0.9;
-        }}
-        
-        .source-overlay-bar .external-link {{
-            color: var(--text-muted);
-            font-size: 0.8rem;
-            text-decoration: none;
-        }}
-        
-        .source-overlay-bar .external-link:hover {{
-            color: var(--accent);
-            text-decoration: underline;
-        }}
-        
-        .source-overlay iframe {{
-            flex: 1;
-            width: 100%;
-            border: none;
-            background: #fff;
-        }}
-        
-        .source-overlay-note {{
-            padding: 0.5rem 1rem;
-            font-size: 0.8rem;
-            color: var(--text-muted);
-            background: #fff;
-            border-bottom: 1px solid var(--border);
-            text-align: center;
-        }}
-        
-        body.source-open {{
-            overflow: hidden;
-        }}
-        
-        body.source-open .favorite {{
-            display: none;
-        }}
-        
-        @media (max-width: 480px) {{
-            h1 {{ font-size: 2rem; }}
-            .meta {{ gap: 1rem; flex-wrap: wrap; }}
-            .availability-banner {{ flex-direction: column; align-items: stretch; text-align: center; }}
-            .edit-row {{ flex-direction: column; }}
-            .edit-item-row {{ flex-wrap: wrap; }}
-        }}
-    </style>
-</head>
-<body class="{body_class}">
-    <div class="header-row">
-        <a href="{back_href}" class="back-link" data-i18n="back">← Terug naar overzicht</a>
-        <div class="header-actions">
-            <div class="lang-toggle" title="Taal / Language">
-                <button type="button" id="lang-nl" class="active" onclick="setRecipeLanguage('nl')">NL</button>
-                <button type="button" id="lang-en" onclick="setRecipeLanguage('en')">EN</button>
-            </div>
-            <button class="edit-btn no-kiosk" onclick="toggleEditMode()" id="edit-toggle-btn">
-                ✏️ Bewerken
-            </button>
-        </div>
-    </div>
-    
-    <!-- VIEW MODE -->
-    <div class="view-mode">
-        <h1 id="recipe-title">{recipe.name}</h1>
-        
-        {'<p class="description" id="recipe-description">' + recipe.description + '</p>' if recipe.description else '<p class="description" id="recipe-description" style="display:none;"></p>'}
-        
-        <div class="meta">
-            <div class="meta-item">
-                <span class="meta-label" data-i18n="servings">Porties</span>
-                <span class="meta-value">{recipe.servings}</span>
-            </div>
-            <div class="meta-item">
-                <span class="meta-label" data-i18n="prep">Voorbereiding</span>
-                <span class="meta-value">{recipe.prep_time_minutes or '—'} min</span>
-            </div>
-            <div class="meta-item">
-                <span class="meta-label" data-i18n="cook">Koken</span>
-                <span class="meta-value">{recipe.cook_time_minutes or '—'} min</span>
-            </div>
-            <div class="meta-item">
-                <span class="meta-label" data-i18n="total">Totaal</span>
-                <span class="meta-value">{time_str}</span>
-            </div>
-        </div>
-        
-        <h2 data-i18n="ingredients">Ingrediënten</h2>
-        <p class="no-kiosk" style="font-size: 0.8rem; color: var(--text-muted); margin-bottom: 0.75rem;" data-i18n="link_hint">Klik op een ingrediënt om het te koppelen aan een voorraaditem</p>
-        {availability_html}
-        <div class="ingredients">
-            <ul>
-                {ingredients_html}
-            </ul>
-        </div>
-
-        {nutrition_html}
-        
-        <h2 data-i18n="instructions">Bereidingswijze</h2>
-        <div class="steps">
-            <ol>
-                {steps_html}
-            </ol>
-        </div>
-        
-        {'<div class="source-link"><button type="button" onclick="openSourceOverlay()" data-i18n="source">' + source_label + '</button></div>' if recipe.source_url else ''}
-    </div>
-    
-    <!-- EDIT MODE -->
-    <div class="edit-mode no-kiosk">
-        <div class="edit-section">
-            <div class="edit-section-title">Receptgegevens</div>
-            
-            <div class="edit-form-group">
-                <label class="edit-label">Naam</label>
-                <input type="text" class="edit-input" id="edit-name" value="{recipe.name}">
-            </div>
-            
-            <div class="edit-form-group">
-                <label class="edit-label">Beschrijving</label>
-                <textarea class="edit-textarea" id="edit-description">{recipe.description or ''}</textarea>
-            </div>
-            
-            <div class="edit-row">
-                <div class="edit-form-group">
-                    <label class="edit-label">Porties</label>
-                    <input type="number" class="edit-input edit-input-small" id="edit-servings" value="{recipe.servings}">
-                </div>
-                <div class="edit-form-group">
-                    <label class="edit-label">Voorbereiding (min)</label>
-                    <input type="number" class="edit-input edit-input-small" id="edit-prep" value="{recipe.prep_time_minutes or ''}">
-                </div>
-                <div class="edit-form-group">
-                    <label class="edit-label">Koken (min)</label>
-                    <input type="number" class="edit-input edit-input-small" id="edit-cook" value="{recipe.cook_time_minutes or ''}">
-                </div>
-            </div>
-        </div>
-        
-        <div class="edit-section">
-            <div class="edit-section-header">
-                <div class="edit-section-title">Ingrediënten</div>
-                <button class="add-btn" onclick="addIngredient()">+ Toevoegen</button>
-            </div>
-            <div id="edit-ingredients-list"></div>
-        </div>
-        
-        <div class="edit-section">
-            <div class="edit-section-header">
-                <div class="edit-section-title">Bereidingswijze</div>
-                <button class="add-btn" onclick="addStep()">+ Stap toevoegen</button>
-            </div>
-            <div id="edit-steps-list"></div>
-        </div>
-        
-        <button class="delete-recipe-btn" onclick="deleteRecipe()">🗑 Recept verwijderen</button>
-        
-        <div class="save-bar">
-            <button class="cancel-btn" onclick="cancelEdit()">Annuleren</button>
-            <button class="save-btn" onclick="saveRecipe()" id="save-btn">Wijzigingen opslaan</button>
-        </div>
-    </div>
-    
-    <button class="favorite view-mode no-kiosk" onclick="toggleFavorite()" title="{'Verwijder uit favorieten' if recipe.is_favorite else 'Toevoegen aan favorieten'}">
-        {'★' if recipe.is_favorite else '☆'}
-    </button>
-    
-    {f'''
-    <div class="source-overlay" id="source-overlay" aria-hidden="true">
-        <div class="source-overlay-bar">
-            <button type="button" class="back-btn" onclick="closeSourceOverlay()">← Terug naar recept</button>
-            <a class="external-link" href="{html_module.escape(recipe.source_url, quote=True)}" target="_blank" rel="noopener noreferrer">Open in nieuw tabblad</a>
-        </div>
-        <div class="source-overlay-note">Sommige sites blokkeren inbedding. Gebruik dan &ldquo;Open in nieuw tabblad&rdquo; — daarna kun je hier terugkeren.</div>
-        <iframe id="source-iframe" title="Origineel recept" referrerpolicy="no-referrer"></iframe>
-    </div>
-    ''' if recipe.source_url else ''}
-    
-    <div class="toast" id="toast"></div>
-    
-    <script>
-        const missingIngredients = {missing_json};
-        const ingredientData = {ingredients_json};
-        const allItems = {items_json};
-        const recipeId = {recipe.id};
-        const sourceUrl = {json.dumps(recipe.source_url)};
-        let currentLang = 'nl';
-        const originalRecipe = {{
-            name: {json.dumps(recipe.name)},
-            description: {json.dumps(recipe.description)},
-            ingredients: {ingredients_json},
-            steps: {json.dumps([{"step_number": s.step_number, "instruction": s.instruction} for s in sorted_steps])},
-            ui: {{
-                servings: 'Porties',
-                prep: 'Voorbereiding',
-                cook: 'Koken',
-                total: 'Totaal',
-                ingredients: 'Ingrediënten',
-                instructions: 'Bereidingswijze',
-                nutrition: 'Voedingswaarden',
-                per_100g: 'Per 100 g',
-                recipe_total: 'Totaal recept',
-                allergens: 'Allergenen',
-                back: '← Terug naar overzicht',
-                link_hint: 'Klik op een ingrediënt om het te koppelen aan een voorraaditem',
-                source: {source_label_js},
-            }},
-            nutrientLabels: {{
-                energy_kcal: 'Energie',
-                proteins: 'Eiwitten',
-                carbohydrates: 'Koolhydraten',
-                fat: 'Vetten',
-                'saturated-fat': 'Verzadigde vetten',
-                sugars: 'Suikers',
-                fiber: 'Vezels',
-                salt: 'Zout',
-            }},
-        }};
-        const translatedCache = {{ en: null }};
-        const nutrientLabelsEn = {{
-            energy_kcal: 'Energy',
-            proteins: 'Protein',
-            carbohydrates: 'Carbs',
-            fat: 'Fat',
-            'saturated-fat': 'Saturated fat',
-            sugars: 'Sugars',
-            fiber: 'Fiber',
-            salt: 'Salt',
-        }};
-
-        try {{ localStorage.setItem('him:lastRecipeId', String(recipeId)); }} catch (e) {{}}
-
-        function openSourceOverlay() {{
-            if (!sourceUrl) return;
-            const overlay = document.getElementById('source-overlay');
-            const iframe = document.getElementById('source-iframe');
-            if (!overlay || !iframe) return;
-            if (!iframe.src) iframe.src = sourceUrl;
-            overlay.classList.add('active');
-            overlay.setAttribute('aria-hidden', 'false');
-            document.body.classList.add('source-open');
-        }}
-
-        function closeSourceOverlay() {{
-            const overlay = document.getElementById('source-overlay');
-            if (!overlay) return;
-            overlay.classList.remove('active');
-            overlay.setAttribute('aria-hidden', 'true');
-            document.body.classList.remove('source-open');
-        }}
-
-        document.addEventListener('keydown', (e) => {{
-            if (e.key === 'Escape' && document.body.classList.contains('source-open')) {{
-                closeSourceOverlay();
-            }}
-        }});
-
-        async function setRecipeLanguage(lang) {{
-            if (lang === currentLang) return;
-            document.getElementById('lang-nl').classList.toggle('active', lang === 'nl');
-            document.getElementById('lang-en').classList.toggle('active', lang === 'en');
-
-            if (lang === 'nl') {{
-                applyRecipeTranslation({{
-                    name: originalRecipe.name,
-                    description: originalRecipe.description,
-                    ingredients: originalRecipe.ingredients.map(i => ({{ name: i.name, notes: i.notes || null }})),
-                    steps: originalRecipe.steps,
-                    ui: originalRecipe.ui,
-                    nutrientLabels: originalRecipe.nutrientLabels,
-                }});
-                currentLang = 'nl';
-                return;
-            }}
-
-            if (translatedCache.en) {{
-                applyRecipeTranslation(translatedCache.en);
-                currentLang = 'en';
-                return;
-            }}
-
-            try {{
-                showToast('Vertalen…');
-                const response = await fetch(`/api/recipes/${{recipeId}}/translate`, {{
-                    method: 'POST',
-                    headers: {{ 'Content-Type': 'application/json' }},
-                    body: JSON.stringify({{ lang: 'en' }}),
-                }});
-                if (!response.ok) {{
-                    const err = await response.json().catch(() => ({{}}));
-                    throw new Error(err.detail || 'Vertalen mislukt');
-                }}
-                const data = await response.json();
-                data.nutrientLabels = nutrientLabelsEn;
-                translatedCache.en = data;
-                applyRecipeTranslation(data);
-                currentLang = 'en';
-            }} catch (err) {{
-                showToast(err.message || 'Vertalen mislukt');
-                document.getElementById('lang-nl').classList.add('active');
-                document.getElementById('lang-en').classList.remove('active');
-            }}
-        }}
-
-        function applyRecipeTranslation(data) {{
-            const title = document.getElementById('recipe-title');
-            if (title) title.textContent = data.name || '';
-            const desc = document.getElementById('recipe-description');
-            if (desc) {{
-                if (data.description) {{
-                    desc.textContent = data.description;
-                    desc.style.display = '';
-                }} else {{
-                    desc.textContent = '';
-                    desc.style.display = 'none';
-                }}
-            }}
-            (data.ingredients || []).forEach((ing, idx) => {{
-                const src = originalRecipe.ingredients[idx];
-                if (!src) return;
-                const nameEl = document.querySelector(`[data-ing-name="${{src.id}}"]`);
-                if (nameEl && ing.name) nameEl.textContent = ing.name;
-                const notesEl = document.querySelector(`[data-ing-notes="${{src.id}}"]`);
-                if (notesEl) notesEl.textContent = ing.notes ? `(${{ing.notes}})` : '';
-            }});
-            (data.steps || []).forEach(step => {{
-                const el = document.querySelector(`li[data-step-number="${{step.step_number}}"] .step-text`);
-                if (el && step.instruction) el.textContent = step.instruction;
-            }});
-            const ui = data.ui || {{}};
-            document.querySelectorAll('[data-i18n]').forEach(el => {{
-                const key = el.getAttribute('data-i18n');
-                if (ui[key]) el.textContent = ui[key];
-            }});
-            const labels = data.nutrientLabels || {{}};
-            document.querySelectorAll('[data-i18n-nutrient-label]').forEach(el => {{
-                const key = el.getAttribute('data-i18n-nutrient-label');
-                if (labels[key]) el.textContent = labels[key];
-            }});
-        }}
-        
-        // Edit mode state
-        let editIngredients = JSON.parse(JSON.stringify(ingredientData));
-        let editSteps = {json.dumps([{"step_number": s.step_number, "instruction": s.instruction} for s in sorted_steps])};
-        
-        function toggleEditMode() {{
-            const body = document.body;
-            const btn = document.getElementById('edit-toggle-btn');
-            
-            if (body.classList.contains('editing')) {{
-                body.classList.remove('editing');
-                btn.textContent = '✏️ Bewerken';
-                btn.classList.remove('active');
-            }} else {{
-                body.classList.add('editing');
-                btn.textContent = '✏️ Bezig met bewerken';
-                btn.classList.add('active');
-                renderEditIngredients();
-                renderEditSteps();
-            }}
-        }}
-        
-        function cancelEdit() {{
-            // Reset to original data
-            editIngredients = JSON.parse(JSON.stringify(ingredientData));
-            editSteps = {json.dumps([{"step_number": s.step_number, "instruction": s.instruction} for s in sorted_steps])};
-            document.body.classList.remove('editing');
-            document.getElementById('edit-toggle-btn').textContent = '✏️ Bewerken';
-            document.getElementById('edit-toggle-btn').classList.remove('active');
-        }}
-        
-        function renderEditIngredients() {{
-            const container = document.getElementById('edit-ingredients-list');
-            if (editIngredients.length === 0) {{
-                container.innerHTML = '<p style="color: var(--text-muted); font-size: 0.9rem;">Nog geen ingrediënten. Klik op "Toevoegen".</p>';
-                return;
-            }}
-            
-            container.innerHTML = editIngredients.map((ing, idx) => `
-                <div class="edit-item" data-idx="${{idx}}">
-                    <div class="edit-item-content">
-                        <div class="edit-item-row">
-                            <input type="text" class="amount-input" placeholder="Hvh" value="${{ing.amount || ''}}" onchange="updateIngredient(${{idx}}, 'amount', this.value)">
-                            <input type="text" class="unit-input" placeholder="Eenheid" value="${{ing.unit || ''}}" onchange="updateIngredient(${{idx}}, 'unit', this.value)">
-                            <input type="text" placeholder="Naam ingrediënt" value="${{ing.name}}" onchange="updateIngredient(${{idx}}, 'name', this.value)">
-                        </div>
-                        <div class="edit-item-row">
-                            <input type="text" placeholder="Notities (optioneel)" value="${{ing.notes || ''}}" onchange="updateIngredient(${{idx}}, 'notes', this.value)" style="flex: 1;">
-                        </div>
-                    </div>
-                    <button class="remove-btn" onclick="removeIngredient(${{idx}})" title="Verwijderen">✕</button>
-                </div>
-            `).join('');
-        }}
-        
-        function updateIngredient(idx, field, value) {{
-            editIngredients[idx][field] = value;
-        }}
-        
-        function addIngredient() {{
-            editIngredients.push({{
-                name: '',
-                amount: '',
-                unit: '',
-                notes: '',
-                item_id: null
-            }});
-            renderEditIngredients();
-        }}
-        
-        function removeIngredient(idx) {{
-            editIngredients.splice(idx, 1);
-            renderEditIngredients();
-        }}
-        
-        function renderEditSteps() {{
-            const container = document.getElementById('edit-steps-list');
-            if (editSteps.length === 0) {{
-                container.innerHTML = '<p style="color: var(--text-muted); font-size: 0.9rem;">Nog geen stappen. Klik op "Stap toevoegen".</p>';
-                return;
-            }}
-            
-            container.innerHTML = editSteps.map((step, idx) => `
-                <div class="edit-item" data-idx="${{idx}}">
-                    <span class="step-number">${{idx + 1}}</span>
-                    <textarea class="step-textarea" placeholder="Beschrijf deze stap..." onchange="updateStep(${{idx}}, this.value)">${{step.instruction}}</textarea>
-                    <button class="remove-btn" onclick="removeStep(${{idx}})" title="Verwijderen">✕</button>
-                </div>
-            `).join('');
-        }}
-        
-        function updateStep(idx, value) {{
-            editSteps[idx].instruction = value;
-        }}
-        
-        function addStep() {{
-            editSteps.push({{
-                step_number: editSteps.length + 1,
-                instruction: ''
-            }});
-            renderEditSteps();
-        }}
-        
-        function removeStep(idx) {{
-            editSteps.splice(idx, 1);
-            // Renumber steps
-            editSteps.forEach((step, i) => step.step_number = i + 1);
-            renderEditSteps();
-        }}
-        
-        async function saveRecipe() {{
-            const saveBtn = document.getElementById('save-btn');
-            saveBtn.disabled = true;
-            saveBtn.textContent = 'Opslaan...';
-            
-            // Gather form data
-            const name = document.getElementById('edit-name').value.trim();
-            const description = document.getElementById('edit-description').value.trim();
-            const servings = parseInt(document.getElementById('edit-servings').value) || 4;
-            const prepTime = parseInt(document.getElementById('edit-prep').value) || null;
-            const cookTime = parseInt(document.getElementById('edit-cook').value) || null;
-            
-            if (!name) {{
-                showToast('Receptnaam is verplicht');
-                saveBtn.disabled = false;
-                saveBtn.textContent = 'Wijzigingen opslaan';
-                return;
-            }}
-            
-            // Filter out empty ingredients
-            const ingredients = editIngredients
-                .filter(ing => ing.name.trim())
-                .map(ing => ({{
-                    name: ing.name.trim(),
-                    amount: ing.amount || null,
-                    unit: ing.unit || null,
-                    notes: ing.notes || null,
-                    item_id: ing.item_id || null
-                }}));
-            
-            // Filter out empty steps and renumber
-            const steps = editSteps
-                .filter(step => step.instruction.trim())
-                .map((step, idx) => ({{
-                    step_number: idx + 1,
-                    instruction: step.instruction.trim()
-                }}));
-            
-            try {{
-                const response = await fetch(`/api/recipes/${{recipeId}}`, {{
-                    method: 'PUT',
-                    headers: {{ 'Content-Type': 'application/json' }},
-                    body: JSON.stringify({{
-                        name,
-                        description: description || null,
-                        servings,
-                        prep_time_minutes: prepTime,
-                        cook_time_minutes: cookTime,
-                        ingredients,
-                        steps
-                    }})
-                }});
-                
-                if (!response.ok) {{
-                    const err = await response.json();
-                    throw new Error(err.detail || 'Opslaan mislukt');
-                }}
-                
-                showToast('Recept opgeslagen!');
-                setTimeout(() => location.reload(), 800);
-            }} catch (err) {{
-                showToast(err.message);
-                saveBtn.disabled = false;
-                saveBtn.textContent = 'Wijzigingen opslaan';
-            }}
-        }}
-        
-        async function deleteRecipe() {{
-            if (!confirm('Weet je zeker dat je dit recept wilt verwijderen? Dit kan niet ongedaan worden gemaakt.')) {{
-                return;
-            }}
-            
-            try {{
-                const response = await fetch(`/api/recipes/${{recipeId}}`, {{
-                    method: 'DELETE'
-                }});
-                
-                if (!response.ok) throw new Error('Verwijderen mislukt');
-                
-                showToast('Recept verwijderd');
-                try {{ localStorage.removeItem('him:lastRecipeId'); }} catch (e) {{}}
-                setTimeout(() => window.location.href = '/?tab=recipes', 800);
-            }} catch (err) {{
-                showToast('Recept verwijderen mislukt');
-            }}
-        }}
-        
-        async function toggleFavorite() {{
-            await fetch('/api/recipes/{recipe.id}/favorite', {{ method: 'POST' }});
-            location.reload();
-        }}
-        
-        async function addMissingToGrocery() {{
-            const btn = document.querySelector('.add-missing-btn');
-            btn.disabled = true;
-            btn.textContent = 'Toevoegen...';
-            
-            let added = 0;
-            for (const ingredient of missingIngredients) {{
-                try {{
-                    const ingredientName = ingredient.name;
-                    const itemId = ingredient.item_id;
-                    
-                    if (itemId) {{
-                        // Move matched item to grocery
-                        await fetch(`/api/items/${{itemId}}/to-grocery`, {{ method: 'POST' }});
-                        added++;
-                    }} else {{
-                        // Search for item by name
-                        const searchRes = await fetch(`/api/search?q=${{encodeURIComponent(ingredientName)}}`);
-                        const searchData = await searchRes.json();
-                        
-                        const exactMatch = searchData.find(item => 
-                            item.name.toLowerCase() === ingredientName.toLowerCase()
-                        );
-                        
-                        if (exactMatch) {{
-                            await fetch(`/api/items/${{exactMatch.id}}/to-grocery`, {{ method: 'POST' }});
-                        }} else {{
-                            await fetch('/api/items', {{
-                                method: 'POST',
-                                headers: {{ 'Content-Type': 'application/json' }},
-                                body: JSON.stringify({{
-                                    name: ingredientName,
-                                    location: 'grocery_list'
-                                }})
-                            }});
-                        }}
-                        added++;
-                    }}
-                }} catch (err) {{
-                    console.error(`Failed to add ${{ingredient.name}}:`, err);
-                }}
-            }}
-            
-            showToast(`${{added}} items toegevoegd aan boodschappenlijst`);
-            btn.textContent = '✓ Toegevoegd aan boodschappen';
-            
-            // Reload after a moment to show updated status
-            setTimeout(() => location.reload(), 1500);
-        }}
-        
-        // ========== Ingredient Dropdown Matching ==========
-        let activeDropdown = null;
-        
-        function openIngredientDropdown(ingId) {{
-            // Close any open dropdown
-            closeAllDropdowns();
-            
-            const dropdown = document.getElementById(`dropdown-${{ingId}}`);
-            const ing = ingredientData.find(i => i.id === ingId);
-            if (!dropdown || !ing) return;
-            
-            // Build dropdown content
-            dropdown.innerHTML = `
-                <div class="dropdown-search">
-                    <input type="text" placeholder="Zoek items..." oninput="filterDropdownItems(${{ingId}}, this.value)" autofocus>
-                </div>
-                <div class="dropdown-items" id="dropdown-items-${{ingId}}">
-                    ${{renderDropdownItems(ingId, '')}}
-                </div>
-                <div class="dropdown-footer">
-                    ${{ing.item_id ? `<button class="btn-clear-match" onclick="clearMatch(${{ingId}})">✕ Koppeling wissen</button>` : ''}}
-                    <button class="btn-add-grocery" onclick="addIngredientToGrocery(${{ingId}})">🛒 "${{ing.name}}" aan boodschappen</button>
-                </div>
-            `;
-            
-            dropdown.classList.add('active');
-            activeDropdown = ingId;
-            
-            // Focus search input
-            setTimeout(() => dropdown.querySelector('input')?.focus(), 50);
-            
-            // Stop event propagation
-            event.stopPropagation();
-        }}
-        
-        function renderDropdownItems(ingId, search) {{
-            const ing = ingredientData.find(i => i.id === ingId);
-            const searchLower = search.toLowerCase();
-            
-            const filtered = allItems.filter(item => 
-                item.name.toLowerCase().includes(searchLower)
-            );
-            
-            if (filtered.length === 0) {{
-                return '<div class="dropdown-item no-match">Geen items gevonden</div>';
-            }}
-            
-            return filtered.map(item => {{
-                const locationLabel = item.location === 'inventory' ? 'Voorraad' : 
-                             item.location === 'grocery_list' ? 'Boodschappen' : 'Archief';
-                const isSelected = ing.item_id === item.id;
-                return `
-                    <div class="dropdown-item ${{isSelected ? 'selected' : ''}}" onclick="selectItemMatch(${{ingId}}, ${{item.id}})">
-                        <span class="item-icon">${{locationLabel}}</span>
-                        <span class="item-name">${{item.name}}</span>
-                        ${{isSelected ? '<span style="color: var(--accent);">Geselecteerd</span>' : ''}}
-                    </div>
-                `;
-            }}).join('');
-        }}
-        
-        function filterDropdownItems(ingId, search) {{
-            const container = document.getElementById(`dropdown-items-${{ingId}}`);
-            if (container) {{
-                container.innerHTML = renderDropdownItems(ingId, search);
-            }}
-        }}
-        
-        async function selectItemMatch(ingId, itemId) {{
-            const ing = ingredientData.find(i => i.id === ingId);
-            if (!ing) return;
-            
-            // Update local data
-            ing.item_id = itemId;
-            
-            // Save to server
-            await saveIngredientMatch(ingId, itemId);
-            
-            closeAllDropdowns();
-        }}
-        
-        async function clearMatch(ingId) {{
-            const ing = ingredientData.find(i => i.id === ingId);
-            if (!ing) return;
-            
-            ing.item_id = null;
-            await saveIngredientMatch(ingId, null);
-            closeAllDropdowns();
-        }}
-        
-        async function saveIngredientMatch(ingId, itemId) {{
-            // Rebuild all ingredients with updated match
-            const updatedIngredients = ingredientData.map(ing => ({{
-                name: ing.name,
-                amount: ing.amount || null,
-                unit: ing.unit || null,
-                notes: ing.notes || null,
-                item_id: ing.item_id
-            }}));
-            
-            try {{
-                const response = await fetch(`/api/recipes/${{recipeId}}`, {{
-                    method: 'PUT',
-                    headers: {{ 'Content-Type': 'application/json' }},
-                    body: JSON.stringify({{ ingredients: updatedIngredients }})
-                }});
-                
-                if (!response.ok) throw new Error('Opslaan mislukt');
-                
-                showToast('Koppeling opgeslagen!');
-                setTimeout(() => location.reload(), 800);
-            }} catch (err) {{
-                showToast('Koppeling opslaan mislukt');
-            }}
-        }}
-        
-        async function addIngredientToGrocery(ingId) {{
-            const ing = ingredientData.find(i => i.id === ingId);
-            if (!ing) return;
-            
-            try {{
-                // Create new item in grocery list
-                const response = await fetch('/api/items', {{
-                    method: 'POST',
-                    headers: {{ 'Content-Type': 'application/json' }},
-                    body: JSON.stringify({{
-                        name: ing.name,
-                        location: 'grocery_list'
-                    }})
-                }});
-                
-                if (!response.ok) {{
-                    const err = await response.json();
-                    throw new Error(err.detail || 'Item toevoegen mislukt');
-                }}
-                
-                const newItem = await response.json();
-                
-                // Link this ingredient to the new item
-                ing.item_id = newItem.id;
-                await saveIngredientMatch(ingId, newItem.id);
-                
-                showToast(`"${{ing.name}}" toegevoegd aan boodschappenlijst`);
-                closeAllDropdowns();
-            }} catch (err) {{
-                showToast(err.message);
-            }}
-        }}
-        
-        function closeAllDropdowns() {{
-            document.querySelectorAll('.ingredient-dropdown').forEach(d => {{
-                d.classList.remove('active');
-                d.innerHTML = '';
-            }});
-            activeDropdown = null;
-        }}
-        
-        // Close dropdown when clicking outside
-        document.addEventListener('click', (e) => {{
-            if (activeDropdown && !e.target.closest('.ingredient-dropdown') && !e.target.closest('.ingredient-content')) {{
-                closeAllDropdowns();
-            }}
-        }});
-        
-        function showToast(message) {{
-            const toast = document.getElementById('toast');
-            toast.textContent = message;
-            toast.classList.add('show');
-            setTimeout(() => toast.classList.remove('show'), 3000);
-        }}
-        
-        // Check if we should auto-enter edit mode (from ?edit=1 query param)
-        if (!document.body.classList.contains('kiosk') && new URLSearchParams(window.location.search).get('edit') === '1') {{
-            toggleEditMode();
-            // Clean up URL
-            window.history.replaceState({{}}, '', window.location.pathname);
-        }}
-    </script>
-</body>
-</html>
-"""
-    return HTMLResponse(content=html)
+    # Encode once and serve 304s for unchanged content (the browser re-fetches
+    # this page after every save; most re-fetches hit the ETag).
+    body = html.encode("utf-8")
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+    _page_cache[cache_key] = (version, body, etag)
+    _page_cache.move_to_end(cache_key)
+    while len(_page_cache) > _PAGE_CACHE_MAX:
+        _page_cache.popitem(last=False)
 
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return HTMLResponse(content=body, headers={"ETag": etag})
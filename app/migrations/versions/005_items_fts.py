@@ -0,0 +1,38 @@
+"""Trigram full-text index over item names for substring search."""
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+VERSION = "005_items_fts"
+
+
+def upgrade(conn) -> None:
+    try:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+            "name, content='items', content_rowid='id', tokenize='trigram')"
+        ))
+    except OperationalError:
+        # SQLite built without FTS5/trigram — /api/search keeps its LIKE scan
+        return
+
+    # External-content FTS tables must be emptied via the special command
+    conn.execute(text("INSERT INTO items_fts(items_fts) VALUES ('delete-all')"))
+    conn.execute(text("INSERT INTO items_fts(rowid, name) SELECT id, name FROM items"))
+
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN "
+        "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); "
+        "END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN "
+        "INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+        "END"
+    ))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF name ON items BEGIN "
+        "INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+        "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); "
+        "END"
+    ))
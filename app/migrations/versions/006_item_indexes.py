@@ -0,0 +1,16 @@
+"""Indexes for the location-filtered item lists and barcode→item joins."""
+
+from sqlalchemy import text
+
+VERSION = "006_item_indexes"
+
+
+def upgrade(conn) -> None:
+    # create_all only adds indexes on brand-new tables; existing databases
+    # pick them up here.
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_items_location_name ON items (location, name)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_barcodes_item_id ON barcodes (item_id)"
+    ))
@@ -0,0 +1,11 @@
+"""Expression index for case-insensitive item name lookups."""
+
+from sqlalchemy import text
+
+VERSION = "007_items_name_lower_index"
+
+
+def upgrade(conn) -> None:
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_items_name_lower ON items (lower(name))"
+    ))
@@ -0,0 +1,15 @@
+"""Store ItemLocation values ('inventory') instead of enum names ('INVENTORY')."""
+
+from sqlalchemy import text
+
+VERSION = "008_location_values"
+
+
+def upgrade(conn) -> None:
+    # The enum's values are exactly the lowercased member names, so existing
+    # rows convert in place. Idempotent: already-converted rows are skipped.
+    # (The CHECK constraint on new databases comes from the model metadata;
+    # SQLite cannot add one to an existing table without a rebuild.)
+    conn.execute(text(
+        "UPDATE items SET location = lower(location) WHERE location != lower(location)"
+    ))
@@ -1,16 +1,19 @@
 """SQLAlchemy database models for inventory management."""
 
 from sqlalchemy import (
+    CheckConstraint,
     Column,
     Integer,
     String,
     Float,
     ForeignKey,
-    Enum as SQLEnum,
+    Index,
     Text,
     Boolean,
     DateTime,
+    TypeDecorator,
 )
+from sqlalchemy import func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -25,6 +28,29 @@ class ItemLocation(str, enum.Enum):
     NEITHER = "neither"          # Item exists but not tracked in either list
 
 
+class ItemLocationType(TypeDecorator):
+    """
+    Persist ItemLocation as its plain value string ('inventory', ...).
+
+    Lighter than SQLEnum's name-based lookup and validation on list-heavy
+    reads, and the stored strings match what the API exposes.
+    """
+    impl = String(12)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, ItemLocation):
+            return value.value
+        return ItemLocation(value).value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return ItemLocation(value)
+
+
 class Item(Base):
     """
     An item that can be tracked in inventory or grocery list.
@@ -33,24 +59,42 @@ class Item(Base):
     The active barcode is the last scanned one, and can be overridden manually.
     """
     __tablename__ = "items"
+    __table_args__ = (
+        # Covers the hot "WHERE location = ? ORDER BY name" list queries:
+        # an index-only range scan instead of a scan-and-sort
+        Index("ix_items_location_name", "location", "name"),
+        CheckConstraint(
+            "location IN ('inventory', 'grocery_list', 'neither')",
+            name="ck_items_location",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, unique=True, index=True)
     location = Column(
-        SQLEnum(ItemLocation),
+        ItemLocationType,
         default=ItemLocation.NEITHER,
         nullable=False
     )
     # No FK constraint — avoids circular dependency with barcodes.item_id
     active_barcode_id = Column(Integer, nullable=True)
 
-    barcodes = relationship("Barcode", back_populates="item", cascade="all, delete-orphan")
+    # Serialized with every ItemResponse; selectin batches the load for list
+    # endpoints instead of one lazy SELECT per item
+    barcodes = relationship(
+        "Barcode", back_populates="item", cascade="all, delete-orphan", lazy="selectin"
+    )
 
     def __repr__(self):
         loc = self.location.value if self.location else None
         return f"<Item(id={self.id}, name='{self.name}', location={loc})>"
 
 
+# Serves case-insensitive exact/prefix lookups (lower(name) = ?/LIKE 'q%')
+# without a stored duplicate of the name column.
+Index("ix_items_name_lower", func.lower(Item.name))
+
+
 class Barcode(Base):
     """
     A barcode that uniquely maps to one item, with optional Open Food Facts data.
@@ -59,7 +103,7 @@ class Barcode(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String, nullable=False, unique=True, index=True)
-    item_id = Column(Integer, ForeignKey("items.id"), nullable=False)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=False, index=True)
 
     # Open Food Facts product data (English source + Dutch translations)
     product_name = Column(String, nullable=True)
@@ -107,8 +151,14 @@ class Recipe(Base):
     source_url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    ingredients = relationship("RecipeIngredient", back_populates="recipe", cascade="all, delete-orphan")
-    steps = relationship("RecipeStep", back_populates="recipe", cascade="all, delete-orphan")
+    # Every serialization walks both collections; selectin keeps recipe
+    # lists at a fixed number of SELECTs instead of two per row
+    ingredients = relationship(
+        "RecipeIngredient", back_populates="recipe", cascade="all, delete-orphan", lazy="selectin"
+    )
+    steps = relationship(
+        "RecipeStep", back_populates="recipe", cascade="all, delete-orphan", lazy="selectin"
+    )
 
     def __repr__(self):
         return f"<Recipe(id={self.id}, name='{self.name}')>"
@@ -130,7 +180,7 @@ class RecipeIngredient(Base):
     item_id = Column(Integer, ForeignKey("items.id"), nullable=True)
 
     recipe = relationship("Recipe", back_populates="ingredients")
-    matched_item = relationship("Item", foreign_keys=[item_id])
+    matched_item = relationship("Item", foreign_keys=[item_id], lazy="selectin")
 
     def __repr__(self):
         return f"<RecipeIngredient(id={self.id}, name='{self.name}', item_id={self.item_id})>"
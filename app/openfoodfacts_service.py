@@ -6,7 +6,11 @@ Uses the public v2 API. No API key required; a descriptive User-Agent is mandato
 
 from __future__ import annotations
 
+import copy
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import Any, Optional
 
 import requests
@@ -17,6 +21,36 @@ USER_AGENT = os.environ.get(
     "HomeInventoryManager/1.0 (local; contact@localhost)",
 )
 
+# Per-thread sessions: keep the TCP+TLS connection to Open Food Facts alive
+# between scans, without sharing a requests.Session (not documented as
+# thread-safe) across the reload-all fan-out threads.
+_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers["User-Agent"] = USER_AGENT
+        _local.session = session
+    return session
+
+# Product payloads change rarely; a short cache absorbs repeat scans of the
+# same barcode (and the not-found answers for unknown ones) without burning
+# Open Food Facts rate limit. Keyed by barcode, which fully determines the
+# request.
+_CACHE_TTL = 3600.0
+_CACHE_MAX = 1024
+_product_cache: OrderedDict = OrderedDict()
+
+# After repeated network failures, fail fast for a cooldown instead of
+# stacking 10-second timeouts on every scan while the API is unreachable.
+# The lock also guards the cache dict against concurrent fetches.
+_BREAKER_THRESHOLD = 3
+_BREAKER_COOLDOWN = 30.0
+_breaker = {"failures": 0, "open_until": 0.0}
+_state_lock = threading.Lock()
+
 PRODUCT_FIELDS = ",".join(
     [
         "code",
@@ -112,24 +146,66 @@ def parse_product(product: dict) -> dict[str, Any]:
     }
 
 
-def fetch_product(barcode: str, timeout: float = 10.0) -> Optional[dict[str, Any]]:
+def fetch_product(
+    barcode: str,
+    timeout: float = 10.0,
+    *,
+    use_cache: bool = True,
+) -> Optional[dict[str, Any]]:
     """
     Fetch and parse a product by barcode.
 
     Returns None when the product is not found.
     Raises requests.RequestException on network/HTTP errors (except 404).
+    Pass ``use_cache=False`` to force a fresh fetch (the reload flow);
+    results are cached either way.
     """
+    if use_cache:
+        with _state_lock:
+            entry = _product_cache.get(barcode)
+            if entry is not None:
+                expires_at, product = entry
+                if time.monotonic() <= expires_at:
+                    _product_cache.move_to_end(barcode)
+                    # Callers mutate the payload (translations); hand out a copy
+                    return copy.deepcopy(product)
+                del _product_cache[barcode]
+
+    with _state_lock:
+        if time.monotonic() < _breaker["open_until"]:
+            raise requests.ConnectionError(
+                "Open Food Facts temporarily unavailable (circuit open)"
+            )
+
     url = f"{BASE_URL}/product/{barcode}"
-    response = requests.get(
-        url,
-        params={"fields": PRODUCT_FIELDS},
-        headers={"User-Agent": USER_AGENT},
-        timeout=timeout,
-    )
+    try:
+        response = _get_session().get(
+            url,
+            params={"fields": PRODUCT_FIELDS},
+            timeout=timeout,
+        )
+    except requests.RequestException:
+        with _state_lock:
+            _breaker["failures"] += 1
+            if _breaker["failures"] >= _BREAKER_THRESHOLD:
+                _breaker["open_until"] = time.monotonic() + _BREAKER_COOLDOWN
+        raise
+    with _state_lock:
+        _breaker["failures"] = 0
+        _breaker["open_until"] = 0.0
     if response.status_code == 404:
-        return None
-    response.raise_for_status()
-    data = response.json()
-    if data.get("status") != 1 or not data.get("product"):
-        return None
-    return parse_product(data["product"])
+        product = None
+    else:
+        response.raise_for_status()
+        data = response.json()
+        if data.get("status") != 1 or not data.get("product"):
+            product = None
+        else:
+            product = parse_product(data["product"])
+
+    with _state_lock:
+        _product_cache[barcode] = (time.monotonic() + _CACHE_TTL, product)
+        _product_cache.move_to_end(barcode)
+        while len(_product_cache) > _CACHE_MAX:
+            _product_cache.popitem(last=False)
+    return copy.deepcopy(product)
@@ -1,6 +1,6 @@
 """Pydantic schemas for API request/response validation."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import Optional, Any
 from datetime import datetime
 from .models import ItemLocation
@@ -34,8 +34,7 @@ class BarcodeResponse(BarcodeBase):
     product_fetched_at: Optional[datetime] = None
     is_active: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # --- Item Schemas ---
@@ -55,8 +54,7 @@ class ItemResponse(ItemBase):
     active_barcode_id: Optional[int] = None
     barcodes: list[BarcodeResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ItemUpdate(BaseModel):
@@ -89,6 +87,20 @@ class AssociateBarcodeRequest(BaseModel):
     item_id: int
 
 
+class MissingIngredient(BaseModel):
+    name: str
+    item_id: Optional[int] = None
+
+
+class BulkGroceryAddRequest(BaseModel):
+    ingredients: list[MissingIngredient] = []
+
+
+class BulkGroceryAddResponse(BaseModel):
+    added: int
+    items: list[ItemResponse] = []
+
+
 class InventoryListResponse(BaseModel):
     count: int
     items: list[ItemResponse]
@@ -137,8 +149,7 @@ class MatchedItemInfo(BaseModel):
     name: str
     location: ItemLocation
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RecipeIngredientResponse(RecipeIngredientBase):
@@ -147,8 +158,7 @@ class RecipeIngredientResponse(RecipeIngredientBase):
     item_id: Optional[int] = None
     matched_item: Optional[MatchedItemInfo] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RecipeStepBase(BaseModel):
@@ -164,8 +174,7 @@ class RecipeStepResponse(RecipeStepBase):
     id: int
     recipe_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RecipeNutritionSummary(BaseModel):
@@ -227,8 +236,7 @@ class RecipeResponse(RecipeBase):
     steps: list[RecipeStepResponse] = []
     nutrition: Optional[RecipeNutritionSummary] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class RecipeUpdate(BaseModel):
@@ -272,6 +280,11 @@ class GeminiGrocerySuggestionsResponse(BaseModel):
     current_inventory: list[str]
 
 
+class RecipeIngredientMatchUpdate(BaseModel):
+    """Link (or unlink, with null) a single recipe ingredient to an item."""
+    item_id: Optional[int] = None
+
+
 class RecipeFullUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -282,3 +295,8 @@ class RecipeFullUpdate(BaseModel):
     source_url: Optional[str] = None
     ingredients: Optional[list[RecipeIngredientCreate]] = None
     steps: Optional[list[RecipeStepCreate]] = None
+
+
+# Built once at import: endpoints returning bare item lists dump straight to
+# JSON bytes through this instead of FastAPI re-validating per request.
+ITEM_LIST_ADAPTER: TypeAdapter = TypeAdapter(list[ItemResponse])
@@ -5,17 +5,22 @@ from __future__ import annotations
 from typing import Optional
 
 from . import schemas
-from .models import Barcode, Item, Recipe
+from .models import Barcode, Item, Recipe, RecipeIngredient, RecipeStep
 from .nutrition import aggregate_recipe_nutrition
 from .product_data import barcode_product_dict, get_active_barcode, loads_json
 
+# Everything below converts trusted, DB-backed values, so the response
+# models are assembled with model_construct: field-validation already
+# happened on the way in, and skipping Pydantic's re-validation per row is
+# the bulk of the serialization cost on the list endpoints.
+
 
 def serialize_barcode(barcode: Barcode, active_barcode_id: Optional[int] = None) -> schemas.BarcodeResponse:
     data = barcode_product_dict(barcode)
     data["is_active"] = (
         active_barcode_id is not None and barcode.id == active_barcode_id
     )
-    return schemas.BarcodeResponse(**data)
+    return schemas.BarcodeResponse.model_construct(**data)
 
 
 def serialize_item(item: Item) -> schemas.ItemResponse:
@@ -23,7 +28,7 @@ def serialize_item(item: Item) -> schemas.ItemResponse:
     if active_id is None:
         active = get_active_barcode(item)
         active_id = active.id if active else None
-    return schemas.ItemResponse(
+    return schemas.ItemResponse.model_construct(
         id=item.id,
         name=item.name,
         location=item.location,
@@ -32,6 +37,33 @@ def serialize_item(item: Item) -> schemas.ItemResponse:
     )
 
 
+def serialize_ingredient(ingredient: RecipeIngredient) -> schemas.RecipeIngredientResponse:
+    matched = ingredient.matched_item
+    return schemas.RecipeIngredientResponse.model_construct(
+        id=ingredient.id,
+        recipe_id=ingredient.recipe_id,
+        name=ingredient.name,
+        amount=ingredient.amount,
+        unit=ingredient.unit,
+        notes=ingredient.notes,
+        item_id=ingredient.item_id,
+        matched_item=schemas.MatchedItemInfo.model_construct(
+            id=matched.id,
+            name=matched.name,
+            location=matched.location,
+        ) if matched is not None else None,
+    )
+
+
+def serialize_step(step: RecipeStep) -> schemas.RecipeStepResponse:
+    return schemas.RecipeStepResponse.model_construct(
+        id=step.id,
+        recipe_id=step.recipe_id,
+        step_number=step.step_number,
+        instruction=step.instruction,
+    )
+
+
 def product_payload_for_nutrition(barcode: Optional[Barcode]) -> Optional[dict]:
     if barcode is None or barcode.product_fetched_at is None:
         # Still allow allergens/nutrition if any product fields present
@@ -70,12 +102,12 @@ def recipe_nutrition_summary(recipe: Recipe) -> schemas.RecipeNutritionSummary:
             }
         )
     result = aggregate_recipe_nutrition(ingredients)
-    return schemas.RecipeNutritionSummary(**result)
+    return schemas.RecipeNutritionSummary.model_construct(**result)
 
 
 def serialize_recipe(recipe: Recipe, *, include_nutrition: bool = True) -> schemas.RecipeResponse:
     nutrition = recipe_nutrition_summary(recipe) if include_nutrition else None
-    return schemas.RecipeResponse(
+    return schemas.RecipeResponse.model_construct(
         id=recipe.id,
         name=recipe.name,
         description=recipe.description,
@@ -85,7 +117,7 @@ def serialize_recipe(recipe: Recipe, *, include_nutrition: bool = True) -> schem
         source_url=recipe.source_url,
         is_favorite=recipe.is_favorite,
         created_at=recipe.created_at,
-        ingredients=recipe.ingredients,
-        steps=recipe.steps,
+        ingredients=[serialize_ingredient(i) for i in recipe.ingredients],
+        steps=[serialize_step(s) for s in recipe.steps],
         nutrition=nutrition,
     )
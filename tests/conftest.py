@@ -1,15 +1,36 @@
 """
 Pytest configuration and fixtures for testing.
 
-Provides a fresh in-memory SQLite database and test client for each test.
+The in-memory SQLite schema is created once per test run; each test runs
+inside a connection-level transaction that is rolled back on teardown, so
+per-test isolation costs a SAVEPOINT instead of full DDL.
 """
 
+import os
+import sys
+import types
+
 import pytest
+
+# The suite asserts the unconfigured (503) behavior of the AI endpoints, and
+# gemini_service computes its configured flag at import time — strip any
+# developer key from the environment before app.main loads so those tests
+# are deterministic everywhere.
+os.environ.pop("GEMINI_API_KEY", None)
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+# Importing google.generativeai costs ~0.5 s of pure module loading; the
+# suite only exercises the unconfigured (503) paths and patches the
+# gemini_service functions directly, so stub it before app.main pulls it in.
+if "google.generativeai" not in sys.modules:
+    sys.modules["google.generativeai"] = types.SimpleNamespace(
+        configure=lambda **_kwargs: None,
+        GenerativeModel=lambda *_args, **_kwargs: None,
+    )
+
 from app.database import Base, get_db
 from app.main import app
 
@@ -23,56 +44,130 @@ engine = create_engine(
     poolclass=StaticPool,  # Required for in-memory SQLite with multiple threads
 )
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# pysqlite's implicit transaction handling breaks SAVEPOINTs; take over
+# transaction control so the rollback fixture actually rolls back
+# (the documented SQLAlchemy recipe for SQLite savepoints).
+@event.listens_for(engine, "connect")
+def _do_connect(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+    # Tests need no durability; keep the journal and temp spill in RAM
+    # (test engine only — the app engine keeps WAL/NORMAL)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+@event.listens_for(engine, "begin")
+def _do_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+# Mirror the production session configuration (expire_on_commit=False) so
+# stale-after-commit bugs reproduce under test instead of being masked by
+# the default post-commit expiry.
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# Schema once per run — tests never see each other's data thanks to the
+# rollback in _db_connection below.
+Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _quiet_logs():
+    """Silence per-request access/transport logging for the whole run."""
+    import logging
+    for name in ("uvicorn.access", "httpx", "urllib3"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _reset_app_caches():
+    """Clear module-level caches so no state leaks between tests.
+
+    The rendered-page and item-row caches are version-guarded, but the AI
+    response cache, the Open Food Facts product cache and its circuit
+    breaker key on inputs that repeat across tests.
+    """
+    from app import main, openfoodfacts_service
+    main._ai_cache.clear()
+    main._page_cache.clear()
+    main._item_rows_cache = None
+    openfoodfacts_service._product_cache.clear()
+    openfoodfacts_service._breaker.update(failures=0, open_until=0.0)
+    yield
 
 
-def override_get_db():
-    """Override the get_db dependency for testing."""
-    db = TestingSessionLocal()
+@pytest.fixture(scope="function")
+def _db_connection():
+    """Outer transaction that swallows everything a test commits."""
+    connection = engine.connect()
+    transaction = connection.begin()
     try:
-        yield db
+        yield connection
     finally:
-        db.close()
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database session for each test."""
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    
-    db = TestingSessionLocal()
+def db_session(_db_connection):
+    """A session joined to the test's rollback transaction via SAVEPOINT."""
+    session = TestingSessionLocal(
+        bind=_db_connection, join_transaction_mode="create_savepoint"
+    )
     try:
-        yield db
+        yield session
     finally:
-        db.close()
-        # Drop all tables after the test
-        Base.metadata.drop_all(bind=engine)
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def _test_client():
+    """One TestClient (and one app lifespan) for the whole run."""
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client_nodb(_test_client):
+    """Client without per-test DB wiring, for endpoints that never touch it."""
+    return _test_client
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with the overridden database dependency."""
-    # Override the get_db dependency
+def client(_db_connection, _test_client):
+    """Test client whose request sessions share the test's transaction."""
+    def override_get_db():
+        db = TestingSessionLocal(
+            bind=_db_connection, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield db
+        finally:
+            db.close()
+
     app.dependency_overrides[get_db] = override_get_db
-    
-    # Create all tables for this test
-    Base.metadata.create_all(bind=engine)
 
     # Avoid real Open Food Facts network calls during ordinary CRUD tests
     from app.models import Setting
-    db = TestingSessionLocal()
+    db = TestingSessionLocal(
+        bind=_db_connection, join_transaction_mode="create_savepoint"
+    )
     db.merge(Setting(key="auto_fetch_products", value="false"))
     db.merge(Setting(key="translate_ingredients", value="false"))
     db.commit()
     db.close()
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
+
+    yield _test_client
+
     # Clean up
-    app.dependency_overrides.clear()
-    Base.metadata.drop_all(bind=engine)
+    app.dependency_overrides.pop(get_db, None)
 
 
 @pytest.fixture
@@ -85,37 +180,52 @@ def sample_item(client):
     return response.json()
 
 
-@pytest.fixture
-def sample_items(client):
-    """Create multiple sample items for testing."""
-    items = []
-    
-    # Inventory items
-    for name, barcode in [("Milk", "111111"), ("Eggs", "222222"), ("Butter", "333333")]:
-        response = client.post(
-            "/api/items",
-            json={"name": name, "location": "inventory", "barcode": barcode}
-        )
-        items.append(response.json())
-    
-    # Grocery list items
-    for name, barcode in [("Bread", "444444"), ("Cheese", "555555")]:
-        response = client.post(
-            "/api/items",
-            json={"name": name, "location": "grocery_list", "barcode": barcode}
-        )
-        items.append(response.json())
-    
-    # Neither location
-    response = client.post(
-        "/api/items",
-        json={"name": "Yogurt", "location": "neither"}
+def seed_items(connection, spec):
+    """
+    Insert (name, barcode, location) rows directly, in one transaction.
+
+    Returns the items as the dict shape the API would have produced. Used by
+    fixtures and tests that only need data staged, not the HTTP flow.
+    """
+    from app.models import Item, Barcode
+    from app.serializers import serialize_item
+
+    session = TestingSessionLocal(
+        bind=connection, join_transaction_mode="create_savepoint"
     )
-    items.append(response.json())
-    
+    created = []
+    for name, code, location in spec:
+        item = Item(name=name, location=location)
+        session.add(item)
+        session.flush()
+        if code:
+            barcode = Barcode(code=code, item_id=item.id)
+            session.add(barcode)
+            session.flush()
+            item.active_barcode_id = barcode.id
+        created.append(item)
+    session.commit()
+
+    items = [serialize_item(item).model_dump(mode="json") for item in created]
+    session.close()
     return items
 
 
+@pytest.fixture
+def sample_items(client, _db_connection):
+    """Seed the standard item corpus directly, skipping six HTTP round-trips."""
+    from app.models import ItemLocation
+
+    return seed_items(_db_connection, [
+        ("Milk", "111111", ItemLocation.INVENTORY),
+        ("Eggs", "222222", ItemLocation.INVENTORY),
+        ("Butter", "333333", ItemLocation.INVENTORY),
+        ("Bread", "444444", ItemLocation.GROCERY_LIST),
+        ("Cheese", "555555", ItemLocation.GROCERY_LIST),
+        ("Yogurt", None, ItemLocation.NEITHER),
+    ])
+
+
 @pytest.fixture
 def sample_recipe(client):
     """Create a sample recipe for testing."""
@@ -139,4 +249,3 @@ def sample_recipe(client):
     }
     response = client.post("/api/recipes", json=recipe_data)
     return response.json()
-
@@ -10,9 +10,9 @@ import pytest
 class TestHealthCheck:
     """Tests for the health check endpoint."""
 
-    def test_health_check(self, client):
+    def test_health_check(self, client_nodb):
         """Test that health check returns healthy status."""
-        response = client.get("/api/health")
+        response = client_nodb.get("/api/health")
         
         assert response.status_code == 200
         data = response.json()
@@ -75,6 +75,8 @@ class TestBarcodeAssociation:
         barcode_codes = {b["code"] for b in data["barcodes"]}
         assert "123456789" in barcode_codes
         assert "NEW_BARCODE" in barcode_codes
+        # The newly scanned barcode becomes active and must be in the list
+        assert data["active_barcode_id"] in {b["id"] for b in data["barcodes"]}
 
     def test_associate_duplicate_barcode(self, client, sample_item):
         """Test that associating an existing barcode fails."""
@@ -240,18 +242,18 @@ class TestItemCRUD:
         
         assert response.status_code == 404
 
-    def test_delete_item(self, client, sample_item):
+    def test_delete_item(self, client, db_session, sample_item):
         """Test deleting an item."""
         response = client.delete(f"/api/items/{sample_item['id']}")
-        
+
         assert response.status_code == 200
         data = response.json()
         assert data["deleted"] is True
         assert data["id"] == sample_item["id"]
-        
-        # Verify item is gone
-        response = client.get(f"/api/items/{sample_item['id']}")
-        assert response.status_code == 404
+
+        # Verify item is gone (directly, without another request cycle)
+        from app.models import Item
+        assert db_session.get(Item, sample_item["id"]) is None
 
     def test_delete_item_not_found(self, client):
         """Test deleting a non-existent item."""
@@ -259,23 +261,23 @@ class TestItemCRUD:
         
         assert response.status_code == 404
 
-    def test_delete_item_removes_barcodes(self, client, sample_item):
+    def test_delete_item_removes_barcodes(self, client, db_session, sample_item):
         """Test that deleting an item also removes its barcodes."""
         # Add another barcode to the item
         client.post(
             "/api/barcode/associate",
             json={"barcode": "SECOND_BARCODE", "item_id": sample_item["id"]}
         )
-        
+
         # Delete the item
         client.delete(f"/api/items/{sample_item['id']}")
-        
-        # Verify barcodes are gone
-        response = client.get("/api/barcode/123456789")
-        assert response.json()["found"] is False
-        
-        response = client.get("/api/barcode/SECOND_BARCODE")
-        assert response.json()["found"] is False
+
+        # Verify the cascade directly in the database
+        from app.models import Barcode
+        remaining = db_session.query(Barcode).filter(
+            Barcode.item_id == sample_item["id"]
+        ).count()
+        assert remaining == 0
 
 
 class TestMoveItemShortcuts:
@@ -309,15 +311,14 @@ class TestMoveItemShortcuts:
         assert response.status_code == 200
         assert response.json()["location"] == "neither"
 
-    def test_move_nonexistent_item(self, client):
+    @pytest.mark.parametrize("path", [
+        "/api/items/99999/to-inventory",
+        "/api/items/99999/to-grocery",
+        "/api/items/99999/remove",
+    ])
+    def test_move_nonexistent_item(self, client, path):
         """Test moving a non-existent item."""
-        response = client.post("/api/items/99999/to-inventory")
-        assert response.status_code == 404
-        
-        response = client.post("/api/items/99999/to-grocery")
-        assert response.status_code == 404
-        
-        response = client.post("/api/items/99999/remove")
+        response = client.post(path)
         assert response.status_code == 404
 
 
@@ -350,6 +351,39 @@ class TestHomeAssistantEndpoints:
         for item in data["items"]:
             assert item["location"] == "grocery_list"
 
+    def test_inventory_etag_304(self, client, sample_items):
+        """Test that an unchanged inventory answers a conditional GET with 304."""
+        first = client.get("/api/inventory")
+        etag = first.headers["etag"]
+
+        second = client.get("/api/inventory", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+
+        # A change invalidates the tag
+        milk = next(i for i in sample_items if i["name"] == "Milk")
+        client.post(f"/api/items/{milk['id']}/to-grocery")
+        third = client.get("/api/inventory", headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.headers["etag"] != etag
+
+    def test_inventory_count_only(self, client, sample_items):
+        """Test the count-only fast path skips serializing items."""
+        response = client.get("/api/inventory?count_only=true")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 3
+        assert data["items"] == []
+
+    def test_grocery_count_only(self, client, sample_items):
+        """Test the count-only fast path for the grocery list."""
+        response = client.get("/api/grocery?count_only=true")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert data["items"] == []
+
     def test_inventory_empty(self, client):
         """Test getting empty inventory."""
         response = client.get("/api/inventory")
@@ -374,7 +408,8 @@ class TestHomeAssistantEndpoints:
         
         data = response.json()
         names = [item["name"] for item in data["items"]]
-        assert names == sorted(names)
+        # Single pass, short-circuits on the first out-of-order pair
+        assert all(a <= b for a, b in zip(names, names[1:]))
 
     def test_grocery_sorted_alphabetically(self, client, sample_items):
         """Test that grocery items are sorted alphabetically."""
@@ -382,65 +417,121 @@ class TestHomeAssistantEndpoints:
         
         data = response.json()
         names = [item["name"] for item in data["items"]]
-        assert names == sorted(names)
+        # Single pass, short-circuits on the first out-of-order pair
+        assert all(a <= b for a, b in zip(names, names[1:]))
 
 
-class TestSearch:
-    """Tests for the search functionality."""
+class TestBulkGroceryAdd:
+    """Tests for the bulk grocery-add endpoint used by the recipe page."""
+
+    def test_bulk_add_moves_and_creates(self, client, sample_items):
+        """Test that linked items move and unknown names become new items."""
+        milk = next(i for i in sample_items if i["name"] == "Milk")
+
+        response = client.post(
+            "/api/grocery/bulk-add",
+            json={"ingredients": [
+                {"name": "Milk", "item_id": milk["id"]},
+                {"name": "Eggs"},          # exact name match, no link
+                {"name": "Saffron"},       # unknown -> created
+            ]}
+        )
 
-    def test_search_by_name(self, client, sample_items):
-        """Test searching items by name."""
-        response = client.get("/api/search?q=milk")
-        
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 1
-        assert data[0]["name"] == "Milk"
+        assert data["added"] == 3
+        assert all(i["location"] == "grocery_list" for i in data["items"])
+
+        grocery = client.get("/api/grocery").json()
+        names = {i["name"] for i in grocery["items"]}
+        assert {"Milk", "Eggs", "Saffron"} <= names
+
+    def test_bulk_add_name_match_case_insensitive(self, client, sample_items):
+        """Test that name resolution ignores case instead of duplicating items."""
+        response = client.post(
+            "/api/grocery/bulk-add",
+            json={"ingredients": [{"name": "milk"}]}
+        )
 
-    def test_search_case_insensitive(self, client, sample_items):
-        """Test that search is case-insensitive."""
-        response = client.get("/api/search?q=MILK")
-        
         assert response.status_code == 200
-        assert len(response.json()) == 1
+        items = client.get("/api/items").json()
+        assert len([i for i in items if i["name"].lower() == "milk"]) == 1
+
+    def test_bulk_add_stale_item_id_falls_back_to_name(self, client, sample_items):
+        """Test that a dead item_id with a known name resolves instead of 500ing."""
+        response = client.post(
+            "/api/grocery/bulk-add",
+            json={"ingredients": [{"name": "Milk", "item_id": 99999}]}
+        )
 
-    def test_search_partial_match(self, client, sample_items):
-        """Test that search matches partial strings."""
-        response = client.get("/api/search?q=il")  # Matches "Milk"
-        
         assert response.status_code == 200
-        assert len(response.json()) >= 1
+        data = response.json()
+        assert data["added"] == 1
+
+        # Resolved to the existing item rather than creating a duplicate
+        items = client.get("/api/items").json()
+        milks = [i for i in items if i["name"] == "Milk"]
+        assert len(milks) == 1
+        assert milks[0]["location"] == "grocery_list"
+
+    def test_bulk_add_empty(self, client):
+        """Test that an empty ingredient list is a no-op."""
+        response = client.post("/api/grocery/bulk-add", json={"ingredients": []})
 
-    def test_search_no_results(self, client, sample_items):
-        """Test search with no matching results."""
-        response = client.get("/api/search?q=nonexistent")
-        
         assert response.status_code == 200
-        assert response.json() == []
+        assert response.json()["added"] == 0
+
+
+class TestSearch:
+    """Tests for the search functionality."""
+
+    @pytest.mark.parametrize("query,expected_count", [
+        ("milk", 1),         # exact name
+        ("MILK", 1),         # case-insensitive
+        ("il", 1),           # partial match ("Milk")
+        ("nonexistent", 0),  # no results
+    ])
+    def test_search_variants(self, client, sample_items, query, expected_count):
+        """Test search across exact, case-insensitive, partial and miss queries."""
+        response = client.get(f"/api/search?q={query}")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == expected_count
+        assert all(query.lower() in item["name"].lower() for item in data)
 
-    def test_search_multiple_results(self, client):
+    def test_search_multiple_results(self, client, _db_connection):
         """Test search returning multiple results."""
-        # Create items with similar names
-        client.post("/api/items", json={"name": "Apple Juice"})
-        client.post("/api/items", json={"name": "Apple Sauce"})
-        client.post("/api/items", json={"name": "Apple Cider"})
-        
+        from app.models import ItemLocation
+        from tests.conftest import seed_items
+
+        seed_items(_db_connection, [
+            ("Apple Juice", None, ItemLocation.NEITHER),
+            ("Apple Sauce", None, ItemLocation.NEITHER),
+            ("Apple Cider", None, ItemLocation.NEITHER),
+        ])
+
         response = client.get("/api/search?q=apple")
-        
+
         assert response.status_code == 200
         assert len(response.json()) == 3
 
-    def test_search_sorted_alphabetically(self, client):
+    def test_search_sorted_alphabetically(self, client, _db_connection):
         """Test that search results are sorted alphabetically."""
-        client.post("/api/items", json={"name": "Zebra Cookies"})
-        client.post("/api/items", json={"name": "Apple Cookies"})
-        client.post("/api/items", json={"name": "Mango Cookies"})
-        
+        from app.models import ItemLocation
+        from tests.conftest import seed_items
+
+        seed_items(_db_connection, [
+            ("Zebra Cookies", None, ItemLocation.NEITHER),
+            ("Apple Cookies", None, ItemLocation.NEITHER),
+            ("Mango Cookies", None, ItemLocation.NEITHER),
+        ])
+
         response = client.get("/api/search?q=cookies")
-        
+
         data = response.json()
         names = [item["name"] for item in data]
-        assert names == sorted(names)
+        assert all(a <= b for a, b in zip(names, names[1:]))
 
 
 class TestWorkflow:
@@ -720,6 +811,47 @@ class TestRecipeCRUD:
         assert response.json()["is_favorite"] is False
 
 
+class TestListQueryCounts:
+    """Regression tests pinning the list endpoints to a fixed query count."""
+
+    @staticmethod
+    def _count_selects(client, path):
+        from sqlalchemy import event
+        from tests.conftest import engine
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            response = client.get(path)
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        assert response.status_code == 200
+        return statements
+
+    def test_item_list_is_not_n_plus_one(self, client, sample_items):
+        """Six items with barcodes should load in a fixed number of SELECTs."""
+        statements = self._count_selects(client, "/api/items")
+        assert len(statements) <= 2  # items + selectin barcodes
+
+    def test_recipe_list_is_not_n_plus_one(self, client, sample_recipe):
+        """Recipe children load per collection, not per recipe."""
+        for n in range(3):
+            client.post("/api/recipes", json={
+                "name": f"Extra {n}",
+                "ingredients": [{"name": "Zout"}],
+                "steps": [{"step_number": 1, "instruction": "Doe iets"}],
+            })
+
+        statements = self._count_selects(client, "/api/recipes")
+        # recipes + ingredients + steps + matched items (+ their barcodes)
+        assert len(statements) <= 5
+
+
 class TestRecipeView:
     """Tests for the recipe view page."""
 
@@ -731,6 +863,32 @@ class TestRecipeView:
         assert "text/html" in response.headers["content-type"]
         assert "Simple Pasta" in response.text
 
+    def test_view_recipe_page_etag_304(self, client, sample_recipe):
+        """Test that an unchanged recipe page returns 304 on a conditional GET."""
+        first = client.get(f"/recipe/{sample_recipe['id']}")
+        etag = first.headers["etag"]
+
+        second = client.get(
+            f"/recipe/{sample_recipe['id']}",
+            headers={"If-None-Match": etag}
+        )
+
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+
+    def test_view_recipe_page_cache_invalidated_on_write(self, client, sample_recipe):
+        """Test that the rendered-page cache drops entries after a write."""
+        first = client.get(f"/recipe/{sample_recipe['id']}")
+        assert "Simple Pasta" in first.text
+
+        client.patch(
+            f"/api/recipes/{sample_recipe['id']}",
+            json={"name": "Renamed Pasta"}
+        )
+
+        second = client.get(f"/recipe/{sample_recipe['id']}")
+        assert "Renamed Pasta" in second.text
+
     def test_view_recipe_page_not_found(self, client):
         """Test viewing a non-existent recipe."""
         response = client.get("/recipe/99999")
@@ -741,9 +899,9 @@ class TestRecipeView:
 class TestHealthCheckExtended:
     """Extended health check tests."""
 
-    def test_health_check_includes_gemini_status(self, client):
+    def test_health_check_includes_gemini_status(self, client_nodb):
         """Test that health check includes Gemini configuration status."""
-        response = client.get("/api/health")
+        response = client_nodb.get("/api/health")
         
         assert response.status_code == 200
         data = response.json()
@@ -790,6 +948,9 @@ class TestRecipeFullUpdate:
         assert response.status_code == 200
         data = response.json()
         assert len(data["steps"]) == 3
+        # The response must carry the replacement steps, not the old ones
+        instructions = [s["instruction"] for s in sorted(data["steps"], key=lambda s: s["step_number"])]
+        assert instructions == ["Boil water", "Add pasta", "Serve"]
 
     def test_update_recipe_not_found(self, client):
         """Test updating a non-existent recipe."""
@@ -876,6 +1037,63 @@ class TestIngredientMatching:
         
         assert recipe["ingredients"][0]["matched_item"]["location"] == "grocery_list"
 
+    def test_patch_single_ingredient_match(self, client, sample_recipe):
+        """Test linking one ingredient to an item via the single-ingredient PATCH."""
+        item = client.post(
+            "/api/items",
+            json={"name": "Spaghetti", "location": "inventory"}
+        ).json()
+        ingredient = sample_recipe["ingredients"][0]
+
+        response = client.patch(
+            f"/api/recipes/{sample_recipe['id']}/ingredients/{ingredient['id']}",
+            json={"item_id": item["id"]}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["item_id"] == item["id"]
+        # The embedded match must reflect the new link, not a stale load
+        assert data["matched_item"]["id"] == item["id"]
+        assert data["matched_item"]["name"] == "Spaghetti"
+
+        # Other ingredients are untouched
+        recipe = client.get(f"/api/recipes/{sample_recipe['id']}").json()
+        assert len(recipe["ingredients"]) == 3
+        others = [i for i in recipe["ingredients"] if i["id"] != ingredient["id"]]
+        assert all(i["item_id"] is None for i in others)
+
+    def test_patch_ingredient_clear_match(self, client, sample_recipe):
+        """Test unlinking an ingredient by patching item_id to null."""
+        item = client.post(
+            "/api/items",
+            json={"name": "Spaghetti", "location": "inventory"}
+        ).json()
+        ingredient = sample_recipe["ingredients"][0]
+        client.patch(
+            f"/api/recipes/{sample_recipe['id']}/ingredients/{ingredient['id']}",
+            json={"item_id": item["id"]}
+        )
+
+        response = client.patch(
+            f"/api/recipes/{sample_recipe['id']}/ingredients/{ingredient['id']}",
+            json={"item_id": None}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["item_id"] is None
+        assert response.json()["matched_item"] is None
+
+    def test_patch_ingredient_wrong_recipe(self, client, sample_recipe):
+        """Test that the ingredient must belong to the recipe in the path."""
+        ingredient = sample_recipe["ingredients"][0]
+        response = client.patch(
+            f"/api/recipes/99999/ingredients/{ingredient['id']}",
+            json={"item_id": None}
+        )
+
+        assert response.status_code == 404
+
     def test_ingredient_without_item_id(self, client):
         """Test that ingredients without item_id have no matched_item."""
         recipe = client.post(
@@ -896,29 +1114,15 @@ class TestIngredientMatching:
 class TestAIEndpoints:
     """Tests for AI endpoints (without actual API calls)."""
 
-    def test_recipe_suggestions_no_api_key(self, client, sample_items):
-        """Test recipe suggestions when Gemini API key is not set."""
-        response = client.post("/api/ai/recipe-suggestions", json={})
-        
-        # Should return 503 when API key not configured
-        assert response.status_code == 503
-        assert "not configured" in response.json()["detail"].lower()
-
-    def test_recipe_suggestions_with_query_no_api_key(self, client, sample_items):
-        """Test recipe suggestions with query when Gemini API key is not set."""
-        response = client.post(
-            "/api/ai/recipe-suggestions",
-            json={"query": "soup recipes"}
-        )
-        
-        # Should return 503 when API key not configured
-        assert response.status_code == 503
+    @pytest.mark.parametrize("url,payload", [
+        ("/api/ai/recipe-suggestions", {}),
+        ("/api/ai/recipe-suggestions", {"query": "soup recipes"}),
+        ("/api/ai/grocery-suggestions", None),
+    ])
+    def test_endpoint_503_without_api_key(self, client, sample_items, url, payload):
+        """Test that AI endpoints return 503 when Gemini is not configured."""
+        response = client.post(url, json=payload)
 
-    def test_grocery_suggestions_no_api_key(self, client, sample_items):
-        """Test grocery suggestions when Gemini API key is not set."""
-        response = client.post("/api/ai/grocery-suggestions")
-        
-        # Should return 503 when API key not configured
         assert response.status_code == 503
         assert "not configured" in response.json()["detail"].lower()
 
@@ -114,6 +114,73 @@ class TestMigrations:
             ]
             assert versions == first
 
+    def test_location_enum_names_become_values(self):
+        engine = _memory_engine()
+        with engine.connect() as conn:
+            _create_legacy_schema(conn)
+            conn.execute(
+                text("INSERT INTO items (id, name, location) VALUES (2, 'Old', 'INVENTORY')")
+            )
+            conn.commit()
+
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT id, location FROM items ORDER BY id")
+            ).fetchall()
+        assert rows == [(1, "inventory"), (2, "inventory")]
+
+    def test_indexes_created_on_existing_tables(self):
+        engine = _memory_engine()
+        with engine.connect() as conn:
+            _create_legacy_schema(conn)
+
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            names = {
+                row[0]
+                for row in conn.execute(
+                    text("SELECT name FROM sqlite_master WHERE type='index'")
+                )
+            }
+        assert "ix_items_location_name" in names
+        assert "ix_barcodes_item_id" in names
+        assert "ix_items_name_lower" in names
+
+    def test_items_fts_stays_in_sync(self):
+        engine = _memory_engine()
+        with engine.connect() as conn:
+            _create_legacy_schema(conn)
+
+        run_migrations(engine)
+
+        with engine.connect() as conn:
+            # Existing rows are indexed
+            hit = conn.execute(
+                text("SELECT rowid FROM items_fts WHERE items_fts MATCH '\"mil\"'")
+            ).fetchall()
+            assert hit == [(1,)]
+
+            # Triggers keep the index current across insert/update/delete
+            conn.execute(
+                text("INSERT INTO items (id, name, location) VALUES (2, 'Apple Juice', 'neither')")
+            )
+            assert conn.execute(
+                text("SELECT rowid FROM items_fts WHERE items_fts MATCH '\"ple jui\"'")
+            ).fetchall() == [(2,)]
+
+            conn.execute(text("UPDATE items SET name = 'Orange Juice' WHERE id = 2"))
+            assert conn.execute(
+                text("SELECT rowid FROM items_fts WHERE items_fts MATCH '\"apple\"'")
+            ).fetchall() == []
+
+            conn.execute(text("DELETE FROM items WHERE id = 2"))
+            assert conn.execute(
+                text("SELECT rowid FROM items_fts WHERE items_fts MATCH '\"juice\"'")
+            ).fetchall() == []
+
     def test_new_nullable_columns_default_to_null(self):
         engine = _memory_engine()
         with engine.connect() as conn:
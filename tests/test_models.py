@@ -5,11 +5,30 @@ Tests the Item, Barcode, Recipe, RecipeIngredient, and RecipeStep models.
 """
 
 import pytest
+from sqlalchemy import insert, text
 from sqlalchemy.exc import IntegrityError
 
 from app.models import Item, Barcode, ItemLocation, Recipe, RecipeIngredient, RecipeStep
 
 
+@pytest.fixture
+def db_item(db_session):
+    """A persisted item for barcode tests."""
+    item = Item(name="Test Item", location=ItemLocation.INVENTORY)
+    db_session.add(item)
+    db_session.flush()
+    return item
+
+
+@pytest.fixture
+def db_recipe(db_session):
+    """A persisted recipe for ingredient/step tests."""
+    recipe = Recipe(name="Test Recipe")
+    db_session.add(recipe)
+    db_session.flush()
+    return recipe
+
+
 class TestItemModel:
     """Tests for the Item model."""
 
@@ -37,25 +56,21 @@ class TestItemModel:
         db_session.add(item1)
         db_session.commit()
 
-        item2 = Item(name="Duplicate", location=ItemLocation.GROCERY_LIST)
-        db_session.add(item2)
-        
+        # Fail inside a SAVEPOINT so only it rolls back and the session
+        # stays usable without recovering the outer transaction
         with pytest.raises(IntegrityError):
-            db_session.commit()
-
-    def test_item_locations(self, db_session):
-        """Test all valid item locations."""
-        for location in ItemLocation:
-            item = Item(name=f"Item_{location.value}", location=location)
-            db_session.add(item)
-        
+            with db_session.begin_nested():
+                db_session.add(Item(name="Duplicate", location=ItemLocation.GROCERY_LIST))
+                db_session.flush()
+
+    @pytest.mark.parametrize("location", list(ItemLocation), ids=lambda loc: loc.value)
+    def test_item_location_roundtrip(self, db_session, location):
+        """Test that each location value survives a database round-trip."""
+        item = Item(name=f"Item_{location.value}", location=location)
+        db_session.add(item)
         db_session.commit()
-        
-        items = db_session.query(Item).all()
-        assert len(items) == 3
-        
-        locations = {item.location for item in items}
-        assert locations == {ItemLocation.INVENTORY, ItemLocation.GROCERY_LIST, ItemLocation.NEITHER}
+
+        assert db_session.get(Item, item.id).location is location
 
     def test_item_repr(self, db_session):
         """Test the string representation of an item."""
@@ -71,43 +86,30 @@ class TestItemModel:
 class TestBarcodeModel:
     """Tests for the Barcode model."""
 
-    def test_create_barcode(self, db_session):
+    def test_create_barcode(self, db_session, db_item):
         """Test creating a barcode associated with an item."""
-        item = Item(name="Test Item", location=ItemLocation.INVENTORY)
-        db_session.add(item)
-        db_session.flush()
-
-        barcode = Barcode(code="123456789", item_id=item.id)
+        barcode = Barcode(code="123456789", item_id=db_item.id)
         db_session.add(barcode)
         db_session.commit()
 
         assert barcode.id is not None
         assert barcode.code == "123456789"
-        assert barcode.item_id == item.id
+        assert barcode.item_id == db_item.id
 
-    def test_barcode_unique_code(self, db_session):
+    def test_barcode_unique_code(self, db_session, db_item):
         """Test that barcode codes must be unique."""
-        item = Item(name="Test Item", location=ItemLocation.INVENTORY)
-        db_session.add(item)
-        db_session.flush()
-
-        barcode1 = Barcode(code="123456789", item_id=item.id)
+        barcode1 = Barcode(code="123456789", item_id=db_item.id)
         db_session.add(barcode1)
         db_session.commit()
 
-        barcode2 = Barcode(code="123456789", item_id=item.id)
-        db_session.add(barcode2)
-        
         with pytest.raises(IntegrityError):
-            db_session.commit()
+            with db_session.begin_nested():
+                db_session.add(Barcode(code="123456789", item_id=db_item.id))
+                db_session.flush()
 
-    def test_barcode_repr(self, db_session):
+    def test_barcode_repr(self, db_session, db_item):
         """Test the string representation of a barcode."""
-        item = Item(name="Test Item", location=ItemLocation.INVENTORY)
-        db_session.add(item)
-        db_session.flush()
-
-        barcode = Barcode(code="123456789", item_id=item.id)
+        barcode = Barcode(code="123456789", item_id=db_item.id)
         db_session.add(barcode)
         db_session.commit()
 
@@ -115,61 +117,52 @@ class TestBarcodeModel:
         assert "123456789" in repr_str
 
 
+@pytest.fixture
+def item_with_barcodes(db_session):
+    """A persisted item carrying three barcodes (one executemany INSERT)."""
+    item = Item(name="Product", location=ItemLocation.INVENTORY)
+    db_session.add(item)
+    db_session.flush()
+    db_session.execute(
+        insert(Barcode),
+        [{"code": code, "item_id": item.id} for code in ("111111", "222222", "333333")],
+    )
+    db_session.commit()
+    return item
+
+
 class TestItemBarcodeRelationship:
     """Tests for the one-to-many relationship between Item and Barcode."""
 
-    def test_item_has_barcodes(self, db_session):
+    @pytest.mark.slow
+    def test_item_has_barcodes(self, db_session, item_with_barcodes):
         """Test that an item can have multiple barcodes."""
-        item = Item(name="Product", location=ItemLocation.INVENTORY)
-        db_session.add(item)
-        db_session.flush()
-
-        barcode1 = Barcode(code="111111", item_id=item.id)
-        barcode2 = Barcode(code="222222", item_id=item.id)
-        barcode3 = Barcode(code="333333", item_id=item.id)
-        
-        db_session.add_all([barcode1, barcode2, barcode3])
-        db_session.commit()
+        db_session.expire(item_with_barcodes, ["barcodes"])
+        assert len(item_with_barcodes.barcodes) == 3
+        assert {b.code for b in item_with_barcodes.barcodes} == {"111111", "222222", "333333"}
 
-        db_session.refresh(item)
-        assert len(item.barcodes) == 3
-        assert {b.code for b in item.barcodes} == {"111111", "222222", "333333"}
-
-    def test_barcode_belongs_to_item(self, db_session):
+    def test_barcode_belongs_to_item(self, db_session, item_with_barcodes):
         """Test that a barcode belongs to exactly one item."""
-        item = Item(name="Product", location=ItemLocation.INVENTORY)
-        db_session.add(item)
-        db_session.flush()
-
-        barcode = Barcode(code="123456789", item_id=item.id)
-        db_session.add(barcode)
-        db_session.commit()
+        barcode = db_session.query(Barcode).filter(Barcode.code == "111111").one()
 
-        db_session.refresh(barcode)
         assert barcode.item is not None
         assert barcode.item.name == "Product"
 
-    def test_cascade_delete(self, db_session):
+    @pytest.mark.slow
+    def test_cascade_delete(self, db_session, item_with_barcodes):
         """Test that deleting an item also deletes its barcodes."""
-        item = Item(name="Product", location=ItemLocation.INVENTORY)
-        db_session.add(item)
-        db_session.flush()
-
-        barcode1 = Barcode(code="111111", item_id=item.id)
-        barcode2 = Barcode(code="222222", item_id=item.id)
-        db_session.add_all([barcode1, barcode2])
-        db_session.commit()
-
         # Verify barcodes exist
-        assert db_session.query(Barcode).count() == 2
+        assert db_session.query(Barcode).count() == 3
 
         # Delete the item
-        db_session.delete(item)
+        db_session.delete(item_with_barcodes)
         db_session.commit()
 
-        # Verify barcodes are also deleted
-        assert db_session.query(Barcode).count() == 0
-        assert db_session.query(Item).count() == 0
+        # Verify barcodes are also deleted (both counts in one round-trip)
+        counts = db_session.execute(
+            text("SELECT (SELECT COUNT(*) FROM barcodes), (SELECT COUNT(*) FROM items)")
+        ).one()
+        assert counts == (0, 0)
 
     def test_item_without_barcodes(self, db_session):
         """Test that an item can exist without any barcodes."""
@@ -177,7 +170,7 @@ class TestItemBarcodeRelationship:
         db_session.add(item)
         db_session.commit()
 
-        db_session.refresh(item)
+        db_session.expire(item, ["barcodes"])
         assert len(item.barcodes) == 0
 
 
@@ -211,11 +204,9 @@ class TestRecipeModel:
         assert recipe.is_favorite is False
         assert recipe.created_at is not None
 
-    def test_recipe_with_ingredients(self, db_session):
+    def test_recipe_with_ingredients(self, db_session, db_recipe):
         """Test creating a recipe with ingredients."""
-        recipe = Recipe(name="Recipe With Ingredients")
-        db_session.add(recipe)
-        db_session.flush()
+        recipe = db_recipe
 
         ing1 = RecipeIngredient(
             recipe_id=recipe.id,
@@ -233,15 +224,13 @@ class TestRecipeModel:
         db_session.add_all([ing1, ing2])
         db_session.commit()
 
-        db_session.refresh(recipe)
+        db_session.expire(recipe, ["ingredients"])
         assert len(recipe.ingredients) == 2
         assert {i.name for i in recipe.ingredients} == {"Flour", "Sugar"}
 
-    def test_recipe_with_steps(self, db_session):
+    def test_recipe_with_steps(self, db_session, db_recipe):
         """Test creating a recipe with steps."""
-        recipe = Recipe(name="Recipe With Steps")
-        db_session.add(recipe)
-        db_session.flush()
+        recipe = db_recipe
 
         step1 = RecipeStep(recipe_id=recipe.id, step_number=1, instruction="First step")
         step2 = RecipeStep(recipe_id=recipe.id, step_number=2, instruction="Second step")
@@ -249,32 +238,41 @@ class TestRecipeModel:
         db_session.add_all([step1, step2, step3])
         db_session.commit()
 
-        db_session.refresh(recipe)
+        db_session.expire(recipe, ["steps"])
         assert len(recipe.steps) == 3
 
-    def test_recipe_cascade_delete(self, db_session):
+    @pytest.mark.slow
+    def test_recipe_cascade_delete(self, db_session, db_recipe):
         """Test that deleting a recipe also deletes ingredients and steps."""
-        recipe = Recipe(name="Recipe To Delete")
-        db_session.add(recipe)
-        db_session.flush()
+        recipe = db_recipe
 
         ing = RecipeIngredient(recipe_id=recipe.id, name="Test Ingredient")
         step = RecipeStep(recipe_id=recipe.id, step_number=1, instruction="Test step")
         db_session.add_all([ing, step])
         db_session.commit()
 
-        # Verify they exist
-        assert db_session.query(RecipeIngredient).count() == 1
-        assert db_session.query(RecipeStep).count() == 1
+        # Verify they exist (one round-trip for both counts)
+        counts = db_session.execute(
+            text(
+                "SELECT (SELECT COUNT(*) FROM recipe_ingredients), "
+                "(SELECT COUNT(*) FROM recipe_steps)"
+            )
+        ).one()
+        assert counts == (1, 1)
 
         # Delete recipe
         db_session.delete(recipe)
         db_session.commit()
 
         # Verify cascade delete
-        assert db_session.query(Recipe).count() == 0
-        assert db_session.query(RecipeIngredient).count() == 0
-        assert db_session.query(RecipeStep).count() == 0
+        counts = db_session.execute(
+            text(
+                "SELECT (SELECT COUNT(*) FROM recipes), "
+                "(SELECT COUNT(*) FROM recipe_ingredients), "
+                "(SELECT COUNT(*) FROM recipe_steps)"
+            )
+        ).one()
+        assert counts == (0, 0, 0)
 
     def test_recipe_repr(self, db_session):
         """Test the string representation of a recipe."""
@@ -2,6 +2,12 @@
 Unit tests for Open Food Facts parsing and recipe nutrition aggregation.
 """
 
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from app import openfoodfacts_service
 from app.openfoodfacts_service import parse_product
 from app.nutrition import (
     aggregate_recipe_nutrition,
@@ -49,6 +55,42 @@ class TestParseProduct:
         assert product["allergens"] == []
 
 
+class TestCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def _reset_breaker(self):
+        openfoodfacts_service._breaker.update(failures=0, open_until=0.0)
+        yield
+        openfoodfacts_service._breaker.update(failures=0, open_until=0.0)
+
+    def test_opens_after_repeated_failures(self):
+        mock_session = Mock()
+        mock_session.get.side_effect = requests.ConnectionError("down")
+        with patch.object(
+            openfoodfacts_service, "_get_session", return_value=mock_session
+        ):
+            for _ in range(openfoodfacts_service._BREAKER_THRESHOLD):
+                with pytest.raises(requests.ConnectionError):
+                    openfoodfacts_service.fetch_product("123", use_cache=False)
+            assert mock_session.get.call_count == openfoodfacts_service._BREAKER_THRESHOLD
+
+            # Circuit is open: fail fast without touching the network
+            with pytest.raises(requests.ConnectionError, match="circuit open"):
+                openfoodfacts_service.fetch_product("123", use_cache=False)
+            assert mock_session.get.call_count == openfoodfacts_service._BREAKER_THRESHOLD
+
+    def test_success_resets_failure_count(self):
+        not_found = type("R", (), {"status_code": 404})()
+        mock_session = Mock()
+        mock_session.get.side_effect = [requests.ConnectionError("down"), not_found]
+        with patch.object(
+            openfoodfacts_service, "_get_session", return_value=mock_session
+        ):
+            with pytest.raises(requests.ConnectionError):
+                openfoodfacts_service.fetch_product("123", use_cache=False)
+            assert openfoodfacts_service.fetch_product("123", use_cache=False) is None
+        assert openfoodfacts_service._breaker["failures"] == 0
+
+
 class TestNutritionHelpers:
     def test_parse_amount_grams(self):
         assert parse_amount_grams("200", "g") == 200.0
@@ -23,8 +23,8 @@ SAMPLE_OFF_PRODUCT = {
 
 
 class TestHealthCheckOff:
-    def test_health_check_no_spoonacular(self, client):
-        response = client.get("/api/health")
+    def test_health_check_no_spoonacular(self, client_nodb):
+        response = client_nodb.get("/api/health")
         assert response.status_code == 200
         data = response.json()
         assert "spoonacular_configured" not in data